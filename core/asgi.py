@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Background upkeep runs in server processes only, not in management commands or tests.
+from quizzes.jobs import start_stale_job_sweep  # noqa: E402
+from users.blacklist import start_token_pruning  # noqa: E402
+
+start_token_pruning()
+start_stale_job_sweep()
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -63,6 +64,7 @@ MIDDLEWARE = [
 
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
+CORS_EXPOSE_HEADERS = ["ETag"]
 
 CORS_ALLOWED_ORIGIN_REGEXES = [
     r"^http://127\.0\.0\.1:\d+$",
@@ -110,10 +112,56 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    # Requires psycopg (pip install "psycopg[binary,pool]"). A pool replaces persistent connections.
+    DB_POOL = os.getenv("DB_POOL", "False") == "True"
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("DB_NAME") or "quizly",
+            'USER': os.getenv("DB_USER", ""),
+            'PASSWORD': os.getenv("DB_PASSWORD", ""),
+            'HOST': os.getenv("DB_HOST", "localhost"),
+            'PORT': os.getenv("DB_PORT", "5432"),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+                    'max_size': int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                    'timeout': int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10")),
+                },
+            } if DB_POOL else {},
+        }
+    }
+elif DB_ENGINE == "sqlite":
+    # WAL lets readers run next to the writer; IMMEDIATE transactions take the write lock up front,
+    # so concurrent writers wait out the busy timeout instead of failing with "database is locked".
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("DB_NAME") or BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'timeout': float(os.getenv("SQLITE_BUSY_TIMEOUT_SECONDS", "20")),
+                'transaction_mode': os.getenv("SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+                'init_command': (
+                    f'PRAGMA journal_mode={os.getenv("SQLITE_JOURNAL_MODE", "WAL")};'
+                    f'PRAGMA synchronous={os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")};'
+                    f'PRAGMA mmap_size={int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))};'
+                ),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'sqlite' or 'postgres', not {DB_ENGINE!r}.")
+
+# Per-process LocMem unless CACHE_BACKEND names a shared backend (e.g. django.core.cache.backends.redis.RedisCache).
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': os.getenv("CACHE_LOCATION", "quizly"),
     }
 }
 
@@ -153,3 +201,28 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = 'static/'
+
+
+# Logging
+# https://docs.djangoproject.com/en/6.0/topics/logging/
+# Pipeline stage lines, job failures and token pruning are logged at INFO by the app loggers.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'quizzes': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'users': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
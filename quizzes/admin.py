@@ -1,9 +1,9 @@
 """
-Admin configuration for Quiz, Question and QuestionOption models.
+Admin configuration for Quiz, Question, QuestionOption, QuizJob and QuizBatch models.
 """
 
 from django.contrib import admin
-from .models import Quiz, Question, QuestionOption
+from .models import Quiz, QuizBatch, QuizJob, Question, QuestionOption
 
 
 class QuestionOptionInline(admin.TabularInline):
@@ -25,8 +25,8 @@ class QuestionInline(admin.StackedInline):
 class QuizAdmin(admin.ModelAdmin):
     """Admin view for quizzes – supports editing title, description and video URL."""
 
-    list_display = ["id", "title", "created_by", "created_at"]
-    list_filter = ["created_by", "created_at"]
+    list_display = ["id", "title", "created_by", "transcript_source", "created_at"]
+    list_filter = ["created_by", "transcript_source", "created_at"]
     search_fields = ["title", "description"]
     readonly_fields = ["created_at", "updated_at"]
     inlines = [QuestionInline]
@@ -47,4 +47,40 @@ class QuestionOptionAdmin(admin.ModelAdmin):
     """Admin view for individual answer options."""
 
     list_display = ["id", "question", "text"]
-    list_filter = ["question__quiz"]
\ No newline at end of file
+    list_filter = ["question__quiz"]
+
+
+@admin.register(QuizJob)
+class QuizJobAdmin(admin.ModelAdmin):
+    """Admin view for quiz-creation jobs – read-only status overview."""
+
+    list_display = ["id", "created_by", "batch", "status", "stage", "quiz", "created_at"]
+    list_filter = ["status", "stage"]
+    search_fields = ["video_url"]
+    readonly_fields = [
+        "batch", "video_url", "created_by", "use_quiz_cache", "status", "stage", "progress", "quiz", "error",
+        "created_at", "updated_at",
+    ]
+
+
+class QuizJobInline(admin.TabularInline):
+    """Read-only list of the jobs within a batch."""
+
+    model = QuizJob
+    extra = 0
+    can_delete = False
+    fields = ["video_url", "status", "stage", "quiz", "error"]
+    readonly_fields = fields
+    show_change_link = True
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(QuizBatch)
+class QuizBatchAdmin(admin.ModelAdmin):
+    """Admin view for batches of quiz-creation jobs."""
+
+    list_display = ["id", "created_by", "playlist_url", "created_at"]
+    readonly_fields = ["created_at"]
+    inlines = [QuizJobInline]
\ No newline at end of file
@@ -0,0 +1,283 @@
+"""
+Async API views for deployment on the ASGI application (core.asgi).
+
+DRF's APIView is synchronous, so under ASGI every request to it is handed to
+a thread. These views are plain async Django views that authenticate with
+the same access_token cookie, reuse the DRF serializers and pagination, and
+query through Django's async ORM. They return the same JSON as the DRF views
+in views.py; request bodies must be JSON.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Max
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from users.authentication import ClaimsOnlyCookieJWTAuthentication, CookieJWTAuthentication
+from ..jobs import QUIZ_JOB_STALE_SECONDS, STALE_JOB_ERROR, submit_quiz_job
+from ..models import Quiz, QuizJob
+from .conditional import conditional_response, quiz_list_validators, quiz_validators, set_validators
+from .pagination import QuizCursorPagination
+from .payload_cache import aquiz_payloads
+from .serializers import (
+    QuizCreateSerializer,
+    QuizJobSerializer,
+    QuizSummarySerializer,
+    QuizUpdateSerializer,
+)
+from .views import _summaries
+
+JOB_EVENTS_POLL_SECONDS = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "1"))
+JOB_EVENTS_MAX_SECONDS = float(os.getenv("JOB_EVENTS_MAX_SECONDS", "3600"))
+JOB_EVENTS_KEEPALIVE_SECONDS = 15
+# JsonResponse bytes differ from DRF's renderer, so strong ETags must not match across the two.
+ETAG_VARIANT = "async-json"
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAPIView(View):
+    """Async base view: cookie JWT authentication and DRF-style JSON errors."""
+
+    authentication_class = CookieJWTAuthentication
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Authenticate the request, then call the async handler."""
+        try:
+            authenticated = await self.authentication_class().aauthenticate(request)
+        except AuthenticationFailed as exc:
+            detail = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+            return JsonResponse(detail, status=status.HTTP_401_UNAUTHORIZED)
+        if authenticated is None:
+            return _error("Authentication credentials were not provided.", status.HTTP_401_UNAUTHORIZED)
+        request.user, request.auth = authenticated
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncQuizListCreateView(AsyncAPIView):
+    """
+    GET  /api/quizzes/  – List the logged-in user's quizzes, cursor-paginated.
+                          ?fields=summary returns question counts instead of questions.
+    POST /api/quizzes/  – Queue quiz creation from a YouTube URL.
+    """
+
+    async def get(self, request):
+        """Return one page of quizzes belonging to the authenticated user, or 304 if unchanged."""
+        quizzes = Quiz.objects.filter(created_by=request.user)
+        state = await quizzes.aaggregate(count=Count("id"), last_updated=Max("updated_at"))
+        etag, last_modified = quiz_list_validators(
+            request.user.id, state["count"], state["last_updated"], request.get_full_path(), ETAG_VARIANT
+        )
+        not_modified = conditional_response(request, etag, last_modified, check_last_modified=False)
+        if not_modified:
+            return not_modified
+        paginator = QuizCursorPagination()
+        drf_request = Request(request)
+        if request.GET.get("fields") == "summary":
+            page = await paginator.apaginate_queryset(_summaries(quizzes), drf_request, view=self)
+            results = QuizSummarySerializer(page, many=True).data
+        else:
+            page = await paginator.apaginate_queryset(quizzes, drf_request, view=self)
+            results = await aquiz_payloads(page)
+        response = JsonResponse({
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": results,
+        })
+        return set_validators(response, etag, last_modified)
+
+    async def post(self, request):
+        """Validate the URL and queue a creation job. Returns 202 with the job."""
+        data, error = _parse_json(request)
+        if error:
+            return error
+        serializer = QuizCreateSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        job = await sync_to_async(submit_quiz_job)(
+            serializer.validated_data["url"],
+            request.user,
+            use_quiz_cache=not serializer.validated_data["fresh"],
+        )
+        return JsonResponse(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class AsyncQuizDetailView(AsyncAPIView):
+    """
+    GET    /api/quizzes/{id}/  – Retrieve a quiz with questions.
+    PATCH  /api/quizzes/{id}/  – Update title and/or description.
+    DELETE /api/quizzes/{id}/  – Delete the quiz.
+    """
+
+    authentication_class = ClaimsOnlyCookieJWTAuthentication
+
+    async def get(self, request, pk):
+        """Return a single quiz with all questions and options, or 304 if unchanged."""
+        quiz, error = await _aget_quiz_or_error(pk, request.user)
+        if error:
+            return error
+        etag, last_modified = quiz_validators(quiz.pk, quiz.updated_at, ETAG_VARIANT)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        return set_validators(JsonResponse((await aquiz_payloads([quiz]))[0]), etag, last_modified)
+
+    async def patch(self, request, pk):
+        """Partially update title and/or description of a quiz."""
+        data, error = _parse_json(request)
+        if error:
+            return error
+        quiz, error = await _aget_quiz_or_error(pk, request.user)
+        if error:
+            return error
+        serializer = QuizUpdateSerializer(quiz, data=data, partial=True)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        for field, value in serializer.validated_data.items():
+            setattr(quiz, field, value)
+        await quiz.asave(update_fields=[*serializer.validated_data, "updated_at"])
+        etag, last_modified = quiz_validators(quiz.pk, quiz.updated_at, ETAG_VARIANT)
+        return set_validators(JsonResponse((await aquiz_payloads([quiz]))[0]), etag, last_modified)
+
+    async def delete(self, request, pk):
+        """Delete a quiz and all its related questions."""
+        quiz, error = await _aget_quiz_or_error(pk, request.user)
+        if error:
+            return error
+        await quiz.adelete()
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+class QuizJobEventsView(AsyncAPIView):
+    """
+    GET /api/quizzes/jobs/{id}/events/  – Server-sent events with the stage and progress of a job.
+
+    Progress is read from the job row, which the worker updates, so the
+    stream works whichever process runs the job. The last event is ``done``
+    and carries the status, the created quiz id or the error. WSGI servers
+    would buffer an async iterator until it ends, so they get a blocking
+    generator that holds the worker thread while the stream is open.
+    """
+
+    authentication_class = ClaimsOnlyCookieJWTAuthentication
+
+    async def get(self, request, pk):
+        """Stream job updates until the job succeeds or fails."""
+        job = await QuizJob.objects.filter(pk=pk).only("created_by_id").afirst()
+        if job is None:
+            return _error("Job not found.", status.HTTP_404_NOT_FOUND)
+        if job.created_by_id != request.user.id:
+            return _error("Access denied.", status.HTTP_403_FORBIDDEN)
+        events = _job_events(pk) if isinstance(request, ASGIRequest) else _job_events_sync(pk)
+        response = StreamingHttpResponse(events, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+def _error(detail: str, status_code: int) -> JsonResponse:
+    """Return a DRF-style ``{"detail": ...}`` error response."""
+    return JsonResponse({"detail": detail}, status=status_code)
+
+
+def _parse_json(request):
+    """Return (data, None) for a JSON object body, or (None, error_response)."""
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError as exc:
+        return None, _error(f"JSON parse error - {exc}", status.HTTP_400_BAD_REQUEST)
+    if not isinstance(data, dict):
+        return None, _error("Expected a JSON object.", status.HTTP_400_BAD_REQUEST)
+    return data, None
+
+
+async def _aget_quiz_or_error(pk: int, user):
+    """Async variant of ``_get_quiz_or_error``: (quiz, None) or (None, error_response)."""
+    try:
+        quiz = await Quiz.objects.aget(pk=pk)
+    except Quiz.DoesNotExist:
+        return None, _error("Quiz not found.", status.HTTP_404_NOT_FOUND)
+    if quiz.created_by_id != user.id:
+        return None, _error("Access denied.", status.HTTP_403_FORBIDDEN)
+    return quiz, None
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class _JobEventStream:
+    """Turn polled job rows into server-sent events, for the ASGI and the WSGI stream alike.
+
+    A job without an update for QUIZ_JOB_STALE_SECONDS was orphaned by a stopped
+    process and ends the stream as failed. Streams close after JOB_EVENTS_MAX_SECONDS
+    either way; EventSource clients reconnect and continue with the current state.
+    """
+
+    fields = ("status", "stage", "progress", "quiz_id", "error", "updated_at")
+
+    def __init__(self):
+        self.last, self.last_sent = None, time.monotonic()
+        self.deadline = self.last_sent + JOB_EVENTS_MAX_SECONDS
+        self.finished = False
+
+    def is_open(self) -> bool:
+        """Return whether the stream should poll the job again."""
+        return not self.finished and time.monotonic() < self.deadline
+
+    def events(self, state) -> str:
+        """Return what to send for one polled job state: a progress event, the final event, a keep-alive or ''."""
+        if state is None:
+            return self._done({"status": QuizJob.Status.FAILED, "quiz": None, "error": "Job was deleted."})
+        if state["status"] in (QuizJob.Status.SUCCEEDED, QuizJob.Status.FAILED):
+            return self._done({"status": state["status"], "quiz": state["quiz_id"], "error": state["error"]})
+        if timezone.now() - state["updated_at"] > timedelta(seconds=QUIZ_JOB_STALE_SECONDS):
+            return self._done({"status": QuizJob.Status.FAILED, "quiz": None, "error": STALE_JOB_ERROR})
+        current = {"status": state["status"], "stage": state["stage"], "progress": state["progress"]}
+        if current != self.last:
+            self.last, self.last_sent = current, time.monotonic()
+            return _sse("progress", current)
+        if time.monotonic() - self.last_sent >= JOB_EVENTS_KEEPALIVE_SECONDS:
+            self.last_sent = time.monotonic()
+            return ": keep-alive\n\n"
+        return ""
+
+    def _done(self, data: dict) -> str:
+        """Return the final ``done`` event and close the stream."""
+        self.finished = True
+        return _sse("done", data)
+
+
+async def _job_events(job_id: int):
+    """Yield a ``progress`` event whenever stage or progress change, then a final ``done`` event."""
+    stream = _JobEventStream()
+    while stream.is_open():
+        text = stream.events(await QuizJob.objects.filter(pk=job_id).values(*stream.fields).afirst())
+        if text:
+            yield text
+        if not stream.finished:
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+
+def _job_events_sync(job_id: int):
+    """Blocking variant of ``_job_events`` for WSGI servers, which cannot stream async iterators."""
+    stream = _JobEventStream()
+    while stream.is_open():
+        text = stream.events(QuizJob.objects.filter(pk=job_id).values(*stream.fields).first())
+        if text:
+            yield text
+        if not stream.finished:
+            time.sleep(JOB_EVENTS_POLL_SECONDS)
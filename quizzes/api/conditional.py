@@ -0,0 +1,54 @@
+"""
+Conditional GET (ETag / Last-Modified) for the quiz endpoints.
+
+The validators come from ``Quiz.updated_at`` and are read with one small
+query, so a matching request is answered with 304 Not Modified before any
+questions are loaded or serialized. ETags are strong: they also cover the
+response format and, for the list, the page requested and the number of
+quizzes, so deleting a quiz changes the list ETag too.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def _etag(*parts) -> str:
+    """Return a strong ETag hashed from ``parts``."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def quiz_validators(quiz_id: int, updated_at, variant: str) -> tuple:
+    """Return (etag, last_modified timestamp) of one quiz."""
+    return _etag("quiz", quiz_id, updated_at.isoformat(), variant), int(updated_at.timestamp())
+
+
+def quiz_list_validators(user_id: int, count: int, last_updated, full_path: str, variant: str) -> tuple:
+    """Return (etag, last_modified timestamp or None) of one page of a user's quiz list."""
+    stamp = last_updated.isoformat() if last_updated else ""
+    last_modified = int(last_updated.timestamp()) if last_updated else None
+    return _etag("quizzes", user_id, count, stamp, full_path, variant), last_modified
+
+
+def conditional_response(request, etag: str, last_modified=None, check_last_modified: bool = True):
+    """Return a 304 (or 412) response with validators if the request's preconditions say so, else None.
+
+    With ``check_last_modified=False`` only the ETag decides; used for lists,
+    whose newest ``updated_at`` does not move when a quiz is deleted.
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified if check_last_modified else None
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag: str, last_modified=None):
+    """Add ETag and Last-Modified headers to ``response`` and return it."""
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
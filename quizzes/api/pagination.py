@@ -0,0 +1,23 @@
+"""
+Pagination classes for the quiz API.
+"""
+
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+
+
+class QuizCursorPagination(CursorPagination):
+    """Stable cursor pages over a user's quizzes, newest first.
+
+    Quizzes sharing a ``created_at`` are told apart by the cursor's offset;
+    ``-id`` keeps their order fixed between requests.
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async variant of ``paginate_queryset``; the page query runs in the sync thread."""
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
@@ -0,0 +1,42 @@
+"""
+Serialized quiz payloads for the read endpoints, served from the payload cache.
+
+Only quizzes without an up-to-date cache entry get their questions and
+options prefetched and run through ``QuizSerializer``; see caches.py for
+storage and invalidation.
+"""
+
+from django.db.models import Prefetch, aprefetch_related_objects, prefetch_related_objects
+
+from ..caches import aget_quiz_payloads, astore_quiz_payloads, get_quiz_payloads, store_quiz_payloads
+from ..models import Question, QuestionOption
+from .serializers import QuizSerializer
+
+# Ordered by the (parent, id) indexes, so SQLite reads the IN (...) lookups in index order without a sort.
+QUESTION_PREFETCHES = (
+    Prefetch("questions", queryset=Question.objects.order_by("quiz_id", "id")),
+    Prefetch("questions__options", queryset=QuestionOption.objects.order_by("question_id", "id")),
+)
+
+
+def _serialize(quizzes: list) -> dict:
+    """Return {quiz: payload} for quizzes whose questions are prefetched."""
+    return {quiz: dict(QuizSerializer(quiz).data) for quiz in quizzes}
+
+
+def quiz_payloads(quizzes: list) -> list:
+    """Return the ``QuizSerializer`` data of ``quizzes`` in order, serializing only cache misses."""
+    payloads, missing = get_quiz_payloads(quizzes)
+    if missing:
+        prefetch_related_objects(missing, *QUESTION_PREFETCHES)
+        payloads.update(store_quiz_payloads(_serialize(missing)))
+    return [payloads[quiz.pk] for quiz in quizzes]
+
+
+async def aquiz_payloads(quizzes: list) -> list:
+    """Async variant of ``quiz_payloads``."""
+    payloads, missing = await aget_quiz_payloads(quizzes)
+    if missing:
+        await aprefetch_related_objects(missing, *QUESTION_PREFETCHES)
+        payloads.update(await astore_quiz_payloads(_serialize(missing)))
+    return [payloads[quiz.pk] for quiz in quizzes]
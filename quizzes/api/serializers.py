@@ -1,5 +1,8 @@
+from django.utils import timezone
 from rest_framework import serializers
-from ..models import Quiz, Question, QuestionOption
+from ..jobs import BATCH_MAX_ITEMS
+from ..models import Quiz, QuizBatch, QuizJob, Question
+from ..utils import extract_playlist_id, extract_video_id
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -11,21 +14,8 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ["id", "question_title", "question_options", "answer"]
 
     def get_question_options(self, obj):
-        """Return all answer options as a list of strings."""
-        return list(obj.options.values_list("text", flat=True))
-
-
-class QuestionDetailSerializer(serializers.ModelSerializer):
-    """Used in POST (create) response – includes timestamps."""
-    question_options = serializers.SerializerMethodField()
-
-    class Meta:
-        model = Question
-        fields = ["id", "question_title", "question_options", "answer", "created_at", "updated_at"]
-
-    def get_question_options(self, obj):
-        """Return all answer options as a list of strings."""
-        return list(obj.options.values_list("text", flat=True))
+        """Return all answer options as a list of strings, read from the prefetched options."""
+        return [option.text for option in obj.options.all()]
 
 
 class QuizSerializer(serializers.ModelSerializer):
@@ -37,27 +27,96 @@ class QuizSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "description", "created_at", "updated_at", "video_url", "questions"]
 
 
-class QuizCreateResponseSerializer(serializers.ModelSerializer):
-    """Used in POST (create) response – questions with timestamps."""
-    questions = QuestionDetailSerializer(many=True, read_only=True)
+class QuizSummarySerializer(serializers.ModelSerializer):
+    """Used in GET list responses with ?fields=summary – question count instead of questions."""
+    question_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Quiz
-        fields = ["id", "title", "description", "created_at", "updated_at", "video_url", "questions"]
+        fields = ["id", "title", "description", "created_at", "updated_at", "question_count"]
 
 
 class QuizCreateSerializer(serializers.Serializer):
     """Validates the YouTube URL for quiz creation."""
     
     url = serializers.URLField()
+    fresh = serializers.BooleanField(required=False, default=False)
 
     def validate_url(self, value):
         """Reject URLs that are not valid YouTube links."""
         if "youtube.com/watch" not in value and "youtu.be/" not in value:
             raise serializers.ValidationError("A valid YouTube URL is required.")
+        if extract_video_id(value) is None:
+            raise serializers.ValidationError("The YouTube URL does not contain a valid video id.")
         return value
 
 
+class QuizJobSerializer(serializers.ModelSerializer):
+    """Reports the state of an asynchronous quiz-creation job."""
+
+    class Meta:
+        model = QuizJob
+        fields = ["id", "status", "stage", "progress", "video_url", "quiz", "error", "created_at", "updated_at"]
+
+
+class QuizBatchCreateSerializer(serializers.Serializer):
+    """Validates a list of YouTube URLs or a playlist URL for batch creation."""
+
+    urls = serializers.ListField(
+        child=serializers.URLField(), required=False, allow_empty=False, max_length=BATCH_MAX_ITEMS
+    )
+    playlist = serializers.URLField(required=False)
+    fresh = serializers.BooleanField(required=False, default=False)
+
+    def validate_urls(self, value):
+        """Reject URLs that do not point to a single YouTube video."""
+        invalid = [url for url in value if extract_video_id(url) is None]
+        if invalid:
+            raise serializers.ValidationError(f"Not valid YouTube video URLs: {', '.join(invalid)}")
+        return value
+
+    def validate_playlist(self, value):
+        """Reject URLs without a YouTube playlist id."""
+        if extract_playlist_id(value) is None:
+            raise serializers.ValidationError("A YouTube URL with a playlist id (list=...) is required.")
+        return value
+
+    def validate(self, data):
+        """Require exactly one of urls and playlist."""
+        if ("urls" in data) == ("playlist" in data):
+            raise serializers.ValidationError("Provide either urls or playlist.")
+        return data
+
+
+class QuizBatchSerializer(serializers.ModelSerializer):
+    """Reports per-item results and overall throughput of a batch."""
+
+    items = QuizJobSerializer(source="jobs", many=True, read_only=True)
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QuizBatch
+        fields = ["id", "playlist_url", "created_at", "progress", "items"]
+
+    def get_progress(self, obj):
+        """Count items per status and derive elapsed time and videos per hour from the prefetched jobs."""
+        jobs = list(obj.jobs.all())
+        counts = {choice: 0 for choice in QuizJob.Status.values}
+        for job in jobs:
+            counts[job.status] += 1
+        done = counts[QuizJob.Status.SUCCEEDED] + counts[QuizJob.Status.FAILED]
+        finished = done == len(jobs)
+        end = max((job.updated_at for job in jobs), default=obj.created_at) if finished else timezone.now()
+        elapsed = max((end - obj.created_at).total_seconds(), 0.001)
+        return {
+            "total": len(jobs),
+            **counts,
+            "finished": finished,
+            "elapsed_seconds": round(elapsed, 1),
+            "videos_per_hour": round(done / elapsed * 3600, 1),
+        }
+
+
 class QuizUpdateSerializer(serializers.ModelSerializer):
     """Validates partial updates of title and/or description."""
 
@@ -4,13 +4,36 @@ quiz/urls.py
 URL routing configuration for the quiz application.
 
 Defines REST-style endpoints for listing, creating,
-retrieving, updating, and deleting Quiz resources.
+retrieving, updating, and deleting Quiz resources, plus
+the status endpoints of asynchronous creation jobs and batches,
+the live progress stream of a job and
+the Prometheus metrics endpoint.
 """
 
+import os
+
 from django.urls import path
-from .views import QuizListCreateView, QuizDetailView
+from .async_views import AsyncQuizDetailView, AsyncQuizListCreateView, QuizJobEventsView
+from .views import (
+    QuizListCreateView,
+    QuizDetailView,
+    QuizJobDetailView,
+    QuizBatchCreateView,
+    QuizBatchDetailView,
+    MetricsView,
+)
+
+# Serve the quiz list/detail endpoints with the async views (for ASGI deployments).
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+ListCreateView = AsyncQuizListCreateView if ASYNC_VIEWS else QuizListCreateView
+DetailView = AsyncQuizDetailView if ASYNC_VIEWS else QuizDetailView
 
 urlpatterns = [
-    path("quizzes/", QuizListCreateView.as_view()),
-    path("quizzes/<int:pk>/", QuizDetailView.as_view()),
+    path("quizzes/", ListCreateView.as_view()),
+    path("quizzes/<int:pk>/", DetailView.as_view()),
+    path("quizzes/jobs/<int:pk>/", QuizJobDetailView.as_view()),
+    path("quizzes/jobs/<int:pk>/events/", QuizJobEventsView.as_view()),
+    path("quizzes/batches/", QuizBatchCreateView.as_view()),
+    path("quizzes/batches/<int:pk>/", QuizBatchDetailView.as_view()),
+    path("metrics/", MetricsView.as_view()),
 ]
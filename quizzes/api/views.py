@@ -3,40 +3,73 @@ API views for quiz management.
 All views return HTTP responses only – business logic lives in utils.py.
 """
 
+from django.db.models import Count, Max, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import BasePermission, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..models import Quiz
+from users.authentication import ClaimsOnlyCookieJWTAuthentication
+
+from ..jobs import BATCH_MAX_ITEMS, submit_quiz_batch, submit_quiz_job
+from ..metrics import METRICS_TOKEN, PROMETHEUS_CONTENT_TYPE, registry
+from ..models import Question, Quiz, QuizBatch, QuizJob
+from ..utils import expand_playlist
+from .conditional import conditional_response, quiz_list_validators, quiz_validators, set_validators
+from .pagination import QuizCursorPagination
+from .payload_cache import quiz_payloads
 from .serializers import (
+    QuizBatchCreateSerializer,
+    QuizBatchSerializer,
     QuizCreateSerializer,
-    QuizSerializer,
-    QuizCreateResponseSerializer,
+    QuizJobSerializer,
+    QuizSummarySerializer,
     QuizUpdateSerializer,
 )
-from ..utils import create_quiz_from_youtube
 
 
 class QuizListCreateView(APIView):
     """
-    GET  /api/quizzes/  – List all quizzes of the logged-in user.
-    POST /api/quizzes/  – Create a quiz from a YouTube URL.
+    GET  /api/quizzes/  – List the logged-in user's quizzes, cursor-paginated.
+                          ?fields=summary returns question counts instead of questions.
+    POST /api/quizzes/  – Queue quiz creation from a YouTube URL.
     """
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        """Return all quizzes belonging to the authenticated user."""
+        """Return one page of quizzes belonging to the authenticated user, or 304 if unchanged."""
         quizzes = Quiz.objects.filter(created_by=request.user)
-        return Response(QuizSerializer(quizzes, many=True).data)
+        state = quizzes.aggregate(count=Count("id"), last_updated=Max("updated_at"))
+        etag, last_modified = quiz_list_validators(
+            request.user.id, state["count"], state["last_updated"],
+            request.get_full_path(), request.accepted_renderer.format,
+        )
+        not_modified = conditional_response(request, etag, last_modified, check_last_modified=False)
+        if not_modified:
+            return not_modified
+        paginator = QuizCursorPagination()
+        if request.query_params.get("fields") == "summary":
+            page = paginator.paginate_queryset(_summaries(quizzes), request, view=self)
+            response = paginator.get_paginated_response(QuizSummarySerializer(page, many=True).data)
+        else:
+            page = paginator.paginate_queryset(quizzes, request, view=self)
+            response = paginator.get_paginated_response(quiz_payloads(page))
+        return set_validators(response, etag, last_modified)
 
     def post(self, request):
-        """Validate the URL, run the pipeline, return the created quiz."""
+        """Validate the URL and queue a creation job. Returns 202 with the job."""
         serializer = QuizCreateSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        return _handle_quiz_creation(serializer.validated_data["url"], request.user)
+        job = submit_quiz_job(
+            serializer.validated_data["url"],
+            request.user,
+            use_quiz_cache=not serializer.validated_data["fresh"],
+        )
+        return Response(QuizJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 
 class QuizDetailView(APIView):
@@ -46,14 +79,19 @@ class QuizDetailView(APIView):
     DELETE /api/quizzes/{id}/  – Delete the quiz.
     """
 
+    authentication_classes = [ClaimsOnlyCookieJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        """Return a single quiz with all questions and options."""
+        """Return a single quiz with all questions and options, or 304 if unchanged."""
         quiz, error = _get_quiz_or_error(pk, request.user)
         if error:
             return error
-        return Response(QuizSerializer(quiz).data)
+        etag, last_modified = quiz_validators(quiz.pk, quiz.updated_at, request.accepted_renderer.format)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        return set_validators(Response(quiz_payloads([quiz])[0]), etag, last_modified)
 
     def patch(self, request, pk):
         """Partially update title and/or description of a quiz."""
@@ -64,7 +102,8 @@ class QuizDetailView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         serializer.save()
-        return Response(QuizSerializer(quiz).data)
+        etag, last_modified = quiz_validators(quiz.pk, quiz.updated_at, request.accepted_renderer.format)
+        return set_validators(Response(quiz_payloads([quiz])[0]), etag, last_modified)
 
     def delete(self, request, pk):
         """Delete a quiz and all its related questions."""
@@ -75,23 +114,129 @@ class QuizDetailView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class QuizJobDetailView(APIView):
+    """
+    GET /api/quizzes/jobs/{id}/  – Report state, stage and resulting quiz of a creation job.
+    """
+
+    authentication_classes = [ClaimsOnlyCookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """Return the current state of a quiz-creation job."""
+        job, error = _get_job_or_error(pk, request.user)
+        if error:
+            return error
+        return Response(QuizJobSerializer(job).data)
+
+
+class QuizBatchCreateView(APIView):
+    """
+    POST /api/quizzes/batches/  – Queue quiz creation for a list of YouTube URLs or a playlist.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """Expand the playlist if given and queue one job per video. Returns 202 with the batch."""
+        serializer = QuizBatchCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        playlist_url = serializer.validated_data.get("playlist", "")
+        if playlist_url:
+            try:
+                urls = expand_playlist(playlist_url, BATCH_MAX_ITEMS)
+            except ValueError as exc:
+                return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            urls = serializer.validated_data["urls"]
+        batch = submit_quiz_batch(
+            urls,
+            request.user,
+            use_quiz_cache=not serializer.validated_data["fresh"],
+            playlist_url=playlist_url,
+        )
+        batch = _with_jobs(QuizBatch.objects.all()).get(pk=batch.pk)
+        return Response(QuizBatchSerializer(batch).data, status=status.HTTP_202_ACCEPTED)
+
+
+class QuizBatchDetailView(APIView):
+    """
+    GET /api/quizzes/batches/{id}/  – Report per-item results and throughput of a batch.
+    """
+
+    authentication_classes = [ClaimsOnlyCookieJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        """Return the current state of every job in a batch."""
+        try:
+            batch = _with_jobs(QuizBatch.objects.all()).get(pk=pk)
+        except QuizBatch.DoesNotExist:
+            return Response({"detail": "Batch not found."}, status=status.HTTP_404_NOT_FOUND)
+        if batch.created_by_id != request.user.id:
+            return Response({"detail": "Access denied."}, status=status.HTTP_403_FORBIDDEN)
+        return Response(QuizBatchSerializer(batch).data)
+
+
+class HasMetricsAccess(BasePermission):
+    """Allow scrapers presenting METRICS_TOKEN as bearer token, otherwise staff users only."""
+
+    def has_permission(self, request, view):
+        if METRICS_TOKEN:
+            return request.headers.get("Authorization") == f"Bearer {METRICS_TOKEN}"
+        return bool(request.user and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    """
+    GET /api/metrics/  – Pipeline metrics of this process in Prometheus text format.
+    """
+
+    permission_classes = [HasMetricsAccess]
+
+    def get(self, request):
+        """Render all counters and histograms of this worker process."""
+        return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _summaries(queryset):
+    """Load summary fields plus a per-row question count.
+
+    A correlated count keeps the page on the owner/created_at index; a JOIN
+    with GROUP BY would group and sort all of the user's quizzes first.
+    """
+    question_count = (
+        Question.objects.filter(quiz=OuterRef("pk")).order_by()
+        .values("quiz").annotate(count=Count("id")).values("count")
+    )
+    return queryset.only("id", "title", "description", "created_at", "updated_at").annotate(
+        question_count=Coalesce(Subquery(question_count), 0)
+    )
+
+
+def _with_jobs(queryset):
+    """Prefetch the jobs of batches in submission order."""
+    return queryset.prefetch_related(Prefetch("jobs", queryset=QuizJob.objects.order_by("id")))
+
+
 def _get_quiz_or_error(pk: int, user):
     """Return (quiz, None) or (None, error_response) for ownership checks."""
     try:
         quiz = Quiz.objects.get(pk=pk)
     except Quiz.DoesNotExist:
         return None, Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
-    if quiz.created_by != user:
+    if quiz.created_by_id != user.id:
         return None, Response({"detail": "Access denied."}, status=status.HTTP_403_FORBIDDEN)
     return quiz, None
 
 
-def _handle_quiz_creation(youtube_url: str, user):
-    """Run the full pipeline and return the appropriate HTTP response."""
+def _get_job_or_error(pk: int, user):
+    """Return (job, None) or (None, error_response) for ownership checks."""
     try:
-        quiz = create_quiz_from_youtube(youtube_url, user)
-    except ValueError as exc:
-        return Response({"detail": str(exc)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-    except Exception as exc:
-        return Response({"detail": f"Unexpected error: {exc}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    return Response(QuizCreateResponseSerializer(quiz).data, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        job = QuizJob.objects.get(pk=pk)
+    except QuizJob.DoesNotExist:
+        return None, Response({"detail": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+    if job.created_by_id != user.id:
+        return None, Response({"detail": "Access denied."}, status=status.HTTP_403_FORBIDDEN)
+    return job, None
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class QuizzesConfig(AppConfig):
     name = 'quizzes'
+
+    def ready(self):
+        """Connect signal receivers and warm up the Whisper model when WHISPER_PRELOAD is enabled."""
+        from . import signals  # noqa: F401
+        from .whisper_models import WHISPER_PRELOAD, model_registry
+
+        if WHISPER_PRELOAD:
+            model_registry.preload()
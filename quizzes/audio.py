@@ -0,0 +1,32 @@
+"""
+Audio helpers for the Whisper pipeline.
+
+In "pcm" mode the native audio stream downloaded by yt-dlp is decoded once,
+straight into the 16 kHz mono float32 samples Whisper consumes, instead of
+being transcoded to MP3 first and decoded again by Whisper.
+"""
+
+import os
+
+import ffmpeg
+import numpy as np
+from whisper.audio import SAMPLE_RATE
+
+WHISPER_AUDIO_MODE = os.getenv("WHISPER_AUDIO_MODE", "mp3")
+
+
+def load_pcm(audio_path: str) -> np.ndarray:
+    """Decode an audio file of any container/codec into Whisper's input samples."""
+    out, _ = (
+        ffmpeg.input(audio_path, threads=0)
+        .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=SAMPLE_RATE)
+        .run(capture_stdout=True, capture_stderr=True)
+    )
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def probe_duration(audio) -> float:
+    """Return the duration in seconds of an audio file path or decoded sample array."""
+    if isinstance(audio, np.ndarray):
+        return len(audio) / SAMPLE_RATE
+    return float(ffmpeg.probe(audio)["format"]["duration"])
@@ -0,0 +1,196 @@
+"""
+Caches for expensive pipeline results and API payloads.
+
+Transcripts are stored per canonical YouTube video id and Whisper model size,
+so a repeated video skips both download and transcription. Validated quiz
+dicts are stored per transcript hash, prompt version and Gemini model, so an
+identical transcript skips the Gemini call.
+
+Serialized quiz payloads live in Django's cache framework (CACHE_BACKEND,
+LocMem by default). Each entry records the quiz's ``updated_at`` and is
+ignored once that moves; the receivers in signals.py also delete it on
+every edit of the quiz, its questions or options.
+"""
+
+import logging
+import os
+import threading
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .metrics import registry
+from .models import CachedQuizData, CachedTranscript
+
+logger = logging.getLogger(__name__)
+
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "1000"))
+TRANSCRIPT_CACHE_MAX_AGE_DAYS = int(os.getenv("TRANSCRIPT_CACHE_MAX_AGE_DAYS", "30"))
+QUIZ_CACHE_MAX_ENTRIES = int(os.getenv("QUIZ_CACHE_MAX_ENTRIES", "1000"))
+QUIZ_CACHE_MAX_AGE_DAYS = int(os.getenv("QUIZ_CACHE_MAX_AGE_DAYS", "30"))
+QUIZ_PAYLOAD_CACHE_TIMEOUT = int(os.getenv("QUIZ_PAYLOAD_CACHE_TIMEOUT", "3600"))
+
+
+class CacheCounters:
+    """Thread-safe hit/miss counters for one cache."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        """Count a lookup as hit or miss."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> dict:
+        """Return the current counts and hit ratio."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / total if total else 0.0}
+
+
+transcript_cache_counters = CacheCounters()
+quiz_cache_counters = CacheCounters()
+payload_cache_counters = CacheCounters()
+
+
+@registry.register_collector
+def _cache_metrics() -> list:
+    """Expose hit and miss counts and hit ratios of the caches."""
+    lookups, ratios = [], []
+    for name, counters in (
+        ("transcript", transcript_cache_counters),
+        ("quiz", quiz_cache_counters),
+        ("payload", payload_cache_counters),
+    ):
+        snapshot = counters.snapshot()
+        lookups.append(({"cache": name, "result": "hit"}, snapshot["hits"]))
+        lookups.append(({"cache": name, "result": "miss"}, snapshot["misses"]))
+        ratios.append(({"cache": name}, snapshot["hit_ratio"]))
+    return [
+        ("quizly_cache_lookups_total", "counter", "Cache lookups by result.", lookups),
+        ("quizly_cache_hit_ratio", "gauge", "Share of cache lookups that were hits since process start.", ratios),
+    ]
+
+
+def _lookup(model, counters: CacheCounters, max_age_days: int, fields: tuple, **key):
+    """Return the fresh entry matching ``key`` with only ``fields`` loaded and mark it as used, or None."""
+    entry = model.objects.filter(
+        created_at__gte=timezone.now() - timedelta(days=max_age_days), **key
+    ).only("id", *fields).first()
+    counters.record(entry is not None)
+    if entry is None:
+        return None
+    model.objects.filter(pk=entry.pk).update(last_used_at=timezone.now())
+    return entry
+
+
+def _store(model, values: dict, **key) -> None:
+    """Insert or replace the entry matching ``key``."""
+    now = timezone.now()
+    try:
+        model.objects.update_or_create(defaults={**values, "created_at": now, "last_used_at": now}, **key)
+    except IntegrityError:
+        logger.warning("%s entry %s was stored concurrently; keeping the existing one", model.__name__, key)
+
+
+def _evict(queryset, max_age_days: int, max_entries: int) -> None:
+    """Drop entries older than the max age, then trim to the max entry count."""
+    queryset.filter(created_at__lt=timezone.now() - timedelta(days=max_age_days)).delete()
+    stale_ids = queryset.order_by("-last_used_at").values_list("id", flat=True)[max_entries:]
+    queryset.filter(id__in=list(stale_ids)).delete()
+
+
+def get_cached_transcript(video_id: str, model_size: str):
+    """Return (transcript, source) stored for a video and model size, or None."""
+    entry = _lookup(
+        CachedTranscript, transcript_cache_counters, TRANSCRIPT_CACHE_MAX_AGE_DAYS, ("transcript", "source"),
+        video_id=video_id, model_size=model_size,
+    )
+    return (entry.transcript, entry.source) if entry else None
+
+
+def store_transcript(video_id: str, model_size: str, transcript: str, source: str) -> None:
+    """Save a transcript and evict expired or least recently used entries."""
+    _store(
+        CachedTranscript, {"transcript": transcript, "source": source},
+        video_id=video_id, model_size=model_size,
+    )
+    _evict(CachedTranscript.objects.all(), TRANSCRIPT_CACHE_MAX_AGE_DAYS, TRANSCRIPT_CACHE_MAX_ENTRIES)
+
+
+def get_cached_quiz_data(transcript_hash: str, prompt_version: str, model_name: str):
+    """Return the stored quiz dict for a transcript, prompt version and model, or None."""
+    entry = _lookup(
+        CachedQuizData, quiz_cache_counters, QUIZ_CACHE_MAX_AGE_DAYS, ("data",),
+        transcript_hash=transcript_hash, prompt_version=prompt_version, model_name=model_name,
+    )
+    return entry.data if entry else None
+
+
+def store_quiz_data(transcript_hash: str, prompt_version: str, model_name: str, data: dict) -> None:
+    """Save a quiz dict, drop entries of older prompt versions and evict by age and size."""
+    _store(
+        CachedQuizData, {"data": data},
+        transcript_hash=transcript_hash, prompt_version=prompt_version, model_name=model_name,
+    )
+    CachedQuizData.objects.exclude(prompt_version=prompt_version).delete()
+    _evict(CachedQuizData.objects.all(), QUIZ_CACHE_MAX_AGE_DAYS, QUIZ_CACHE_MAX_ENTRIES)
+
+
+def quiz_payload_key(quiz_id: int) -> str:
+    """Return the cache key of a quiz's serialized payload."""
+    return f"quizly:quiz-payload:{quiz_id}"
+
+
+def _fresh_payloads(quizzes: list, entries: dict) -> tuple:
+    """Split ``quizzes`` into ({quiz_id: payload} of up-to-date entries, [quizzes without one])."""
+    payloads, missing = {}, []
+    for quiz in quizzes:
+        entry = entries.get(quiz_payload_key(quiz.pk))
+        hit = entry is not None and entry[0] == quiz.updated_at
+        payload_cache_counters.record(hit)
+        if hit:
+            payloads[quiz.pk] = entry[1]
+        else:
+            missing.append(quiz)
+    return payloads, missing
+
+
+def get_quiz_payloads(quizzes: list) -> tuple:
+    """Return ({quiz_id: payload} found in the cache, [quizzes that still need serializing])."""
+    return _fresh_payloads(quizzes, cache.get_many([quiz_payload_key(quiz.pk) for quiz in quizzes]))
+
+
+async def aget_quiz_payloads(quizzes: list) -> tuple:
+    """Async variant of ``get_quiz_payloads``."""
+    return _fresh_payloads(quizzes, await cache.aget_many([quiz_payload_key(quiz.pk) for quiz in quizzes]))
+
+
+def _payload_entries(payloads: dict) -> dict:
+    """Return cache entries for a {quiz: payload} dict."""
+    return {quiz_payload_key(quiz.pk): (quiz.updated_at, payload) for quiz, payload in payloads.items()}
+
+
+def store_quiz_payloads(payloads: dict) -> dict:
+    """Cache a {quiz: payload} dict and return it keyed by quiz id."""
+    cache.set_many(_payload_entries(payloads), QUIZ_PAYLOAD_CACHE_TIMEOUT)
+    return {quiz.pk: payload for quiz, payload in payloads.items()}
+
+
+async def astore_quiz_payloads(payloads: dict) -> dict:
+    """Async variant of ``store_quiz_payloads``."""
+    await cache.aset_many(_payload_entries(payloads), QUIZ_PAYLOAD_CACHE_TIMEOUT)
+    return {quiz.pk: payload for quiz, payload in payloads.items()}
+
+
+def invalidate_quiz_payloads(quiz_ids) -> None:
+    """Delete the cached payloads of the given quizzes."""
+    cache.delete_many([quiz_payload_key(quiz_id) for quiz_id in quiz_ids])
@@ -0,0 +1,102 @@
+"""
+Caption-first transcripts: use YouTube subtitle tracks when a video has them.
+
+yt-dlp lists manual subtitles and automatic captions without downloading any
+media. A usable track is fetched and converted to plain text, so Whisper only
+runs for videos without captions.
+"""
+
+import html
+import logging
+import os
+import re
+import xml.etree.ElementTree as ET
+
+import yt_dlp
+
+from .models import TranscriptSource
+
+logger = logging.getLogger(__name__)
+
+CAPTIONS_ENABLED = os.getenv("CAPTIONS_ENABLED", "True") == "True"
+CAPTION_LANGUAGES = [lang.strip() for lang in os.getenv("CAPTION_LANGUAGES", "en,de").split(",") if lang.strip()]
+CAPTION_MIN_WORDS = int(os.getenv("CAPTION_MIN_WORDS", "50"))
+
+CAPTION_FORMATS = ("vtt", "srv3", "srv2", "srv1")
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+CUE_TIMING_PATTERN = re.compile(r"-->")
+
+
+def parse_vtt(raw: str) -> str:
+    """Return the spoken text of a WebVTT file, dropping timings, tags and rolling repeats."""
+    lines = []
+    skip_block = False
+    for line in raw.splitlines():
+        line = line.strip()
+        if not line:
+            skip_block = False
+            continue
+        if line.startswith(("WEBVTT", "NOTE", "STYLE", "REGION")):
+            skip_block = True
+        if skip_block or CUE_TIMING_PATTERN.search(line) or line.isdigit():
+            continue
+        text = html.unescape(TAG_PATTERN.sub("", line)).strip()
+        if text and (not lines or lines[-1] != text):
+            lines.append(text)
+    return " ".join(lines)
+
+
+def parse_srv(raw: str) -> str:
+    """Return the spoken text of a YouTube srv1/srv2/srv3 XML caption file."""
+    root = ET.fromstring(raw)
+    texts = []
+    for element in root.iter():
+        if element.tag in ("p", "text"):
+            text = html.unescape(" ".join("".join(element.itertext()).split()))
+            if text:
+                texts.append(text)
+    return " ".join(texts)
+
+
+def _pick_format(formats: list):
+    """Return the first caption format we can parse, or None."""
+    by_ext = {fmt.get("ext"): fmt for fmt in formats if fmt.get("url")}
+    return next((by_ext[ext] for ext in CAPTION_FORMATS if ext in by_ext), None)
+
+
+def _pick_track(info: dict):
+    """Return (format, source) of the best caption track, preferring manual subtitles."""
+    languages = [lang for lang in [info.get("language"), *CAPTION_LANGUAGES] if lang]
+    manual = {key: value for key, value in (info.get("subtitles") or {}).items() if key != "live_chat"}
+    automatic = info.get("automatic_captions") or {}
+    candidates = (
+        (manual, languages + list(manual), TranscriptSource.MANUAL_CAPTIONS),
+        # "-orig" tracks are the original-language captions, the rest are machine translations.
+        (automatic, [f"{lang}-orig" for lang in languages] + languages, TranscriptSource.AUTOMATIC_CAPTIONS),
+    )
+    for tracks, keys, source in candidates:
+        for key in keys:
+            fmt = _pick_format(tracks.get(key) or [])
+            if fmt is not None:
+                return fmt, source
+    return None, None
+
+
+def fetch_caption_transcript(youtube_url: str):
+    """Return (text, source, duration_seconds) from a caption track, or None if none is usable."""
+    opts = {"skip_download": True, "quiet": True, "no_warnings": True}
+    try:
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(youtube_url, download=False)
+            fmt, source = _pick_track(info)
+            if fmt is None:
+                return None
+            raw = ydl.urlopen(fmt["url"]).read().decode("utf-8", "replace")
+        text = parse_vtt(raw) if fmt["ext"] == "vtt" else parse_srv(raw)
+    except Exception as exc:
+        logger.warning("Could not fetch captions for %s, falling back to Whisper: %s", youtube_url, exc)
+        return None
+    if len(text.split()) < CAPTION_MIN_WORDS:
+        return None
+    return text, source, info.get("duration") or 0
@@ -0,0 +1,96 @@
+"""
+Shared Gemini client with a concurrency limit and retry policy.
+
+One ``genai.Client`` per process reuses its HTTP connections. A semaphore caps
+the number of in-flight requests, and transient failures (429 and 5xx
+responses, transport errors) are retried with jittered exponential backoff
+until an overall deadline.
+"""
+
+import logging
+import os
+import threading
+
+import httpx
+from google import genai
+from google.genai import errors, types
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_before_delay,
+    wait_random_exponential,
+)
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash")
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_RETRY_ATTEMPTS = int(os.getenv("GEMINI_RETRY_ATTEMPTS", "5"))
+GEMINI_RETRY_DEADLINE_SECONDS = float(os.getenv("GEMINI_RETRY_DEADLINE_SECONDS", "180"))
+GEMINI_REQUEST_TIMEOUT_SECONDS = float(os.getenv("GEMINI_REQUEST_TIMEOUT_SECONDS", "120"))
+GEMINI_RETRY_MAX_WAIT_SECONDS = 30
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+retries = registry.counter("quizly_gemini_retries_total", "Gemini calls retried after a transient failure.")
+throttled = registry.counter(
+    "quizly_gemini_throttled_total", "Gemini calls delayed by the local concurrency limit or a 429 response."
+)
+
+_client = None
+_client_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+
+
+def get_client() -> genai.Client:
+    """Return the process-wide Gemini client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = genai.Client(
+                api_key=GEMINI_API_KEY,
+                http_options=types.HttpOptions(timeout=int(GEMINI_REQUEST_TIMEOUT_SECONDS * 1000)),
+            )
+        return _client
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Return True for failures worth retrying."""
+    if isinstance(exc, errors.APIError):
+        return exc.code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, httpx.TransportError)
+
+
+def _before_sleep(retry_state) -> None:
+    """Count and log a retry before backing off."""
+    exc = retry_state.outcome.exception()
+    reason = str(exc.code) if isinstance(exc, errors.APIError) else type(exc).__name__
+    retries.inc(reason=reason)
+    if reason == "429":
+        throttled.inc(source="api")
+    logger.warning(
+        "Gemini call failed (%s), retry %d in %.1fs", reason, retry_state.attempt_number, retry_state.upcoming_sleep
+    )
+
+
+@retry(
+    retry=retry_if_exception(_is_transient),
+    wait=wait_random_exponential(multiplier=1, max=GEMINI_RETRY_MAX_WAIT_SECONDS),
+    stop=stop_after_attempt(GEMINI_RETRY_ATTEMPTS) | stop_before_delay(GEMINI_RETRY_DEADLINE_SECONDS),
+    before_sleep=_before_sleep,
+    reraise=True,
+)
+def generate_content(prompt: str, config: types.GenerateContentConfig) -> str:
+    """Send a prompt within the concurrency limit and return the response text."""
+    if not _slots.acquire(blocking=False):
+        throttled.inc(source="local")
+        _slots.acquire()
+    try:
+        response = get_client().models.generate_content(model=GEMINI_MODEL, contents=prompt, config=config)
+    finally:
+        _slots.release()
+    return response.text
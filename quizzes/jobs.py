@@ -0,0 +1,290 @@
+"""
+Local worker pool for asynchronous quiz creation.
+
+POST /api/quizzes/ only records a QuizJob; the pipeline itself runs on a
+thread pool inside the worker process, so no external broker is needed.
+
+Batches run as a stage pipeline instead: every stage (fetch, transcribe,
+generate) has its own pool, and a job moves to the next pool as soon as its
+stage finishes. Downloads of one video therefore overlap the transcription
+of the previous one and the Gemini calls of the one before that.
+
+Jobs queued in a process that stops never finish. Every server process
+therefore refreshes ``updated_at`` of the unfinished jobs it has queued each
+QUIZ_JOB_SWEEP_INTERVAL_SECONDS, and ``fail_stale_jobs`` marks jobs that no
+live process refreshed for QUIZ_JOB_STALE_SECONDS as failed. Each pipeline
+step claims its job with a conditional update, so a failed job never runs.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from .models import QuizBatch, QuizJob
+from .utils import build_quiz, create_quiz_from_youtube, fetch_audio, lookup_transcript, transcribe_fetched_audio
+
+logger = logging.getLogger(__name__)
+
+QUIZ_WORKERS = int(os.getenv("QUIZ_WORKERS", "2"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_FETCH_WORKERS = int(os.getenv("BATCH_FETCH_WORKERS", "2"))
+BATCH_TRANSCRIBE_WORKERS = int(os.getenv("BATCH_TRANSCRIBE_WORKERS", "1"))
+BATCH_GENERATE_WORKERS = int(os.getenv("BATCH_GENERATE_WORKERS", "4"))
+QUIZ_JOB_STALE_SECONDS = float(os.getenv("QUIZ_JOB_STALE_SECONDS", "3600"))
+QUIZ_JOB_SWEEP_INTERVAL_SECONDS = float(os.getenv("QUIZ_JOB_SWEEP_INTERVAL_SECONDS", "600"))
+PROGRESS_WRITE_INTERVAL_SECONDS = 1.0
+STALE_JOB_ERROR = "The job was interrupted before it finished. Please submit the video again."
+
+FETCH, TRANSCRIBE, GENERATE = "fetch", "transcribe", "generate"
+STAGE_WORKERS = {FETCH: BATCH_FETCH_WORKERS, TRANSCRIBE: BATCH_TRANSCRIBE_WORKERS, GENERATE: BATCH_GENERATE_WORKERS}
+UNFINISHED = [QuizJob.Status.PENDING, QuizJob.Status.RUNNING]
+
+_executor = None
+_executor_lock = threading.Lock()
+_stage_executors = {}
+# Ids of the jobs queued in this process; finished ones are dropped by the next heartbeat.
+_queued_jobs = set()
+_queued_jobs_lock = threading.Lock()
+# Bounds the downloaded audio waiting for transcription, so fetching cannot run far ahead.
+_audio_slots = threading.BoundedSemaphore(BATCH_FETCH_WORKERS + BATCH_TRANSCRIBE_WORKERS)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide job executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=QUIZ_WORKERS, thread_name_prefix="quiz-job")
+        return _executor
+
+
+def _get_stage_executor(stage: str) -> ThreadPoolExecutor:
+    """Return the process-wide executor of one batch stage, creating it on first use."""
+    with _executor_lock:
+        if stage not in _stage_executors:
+            _stage_executors[stage] = ThreadPoolExecutor(
+                max_workers=STAGE_WORKERS[stage], thread_name_prefix=f"quiz-batch-{stage}"
+            )
+        return _stage_executors[stage]
+
+
+def shutdown_job_executor(cancel_pending: bool = False) -> None:
+    """Wait for the running single-video jobs of this process, optionally dropping the queued ones."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=cancel_pending)
+
+
+def submit_quiz_job(youtube_url: str, user, use_quiz_cache: bool = True) -> QuizJob:
+    """Create a pending job and schedule it once the surrounding transaction commits."""
+    job = QuizJob.objects.create(video_url=youtube_url, created_by=user, use_quiz_cache=use_quiz_cache)
+    transaction.on_commit(lambda: _queue_job(job.pk))
+    return job
+
+
+def _track_jobs(job_ids: list) -> None:
+    """Remember jobs queued in this process, so the heartbeat keeps them from going stale."""
+    with _queued_jobs_lock:
+        _queued_jobs.update(job_ids)
+
+
+def _queue_job(job_id: int) -> None:
+    """Queue a single-video job on the job executor."""
+    _track_jobs([job_id])
+    _get_executor().submit(run_quiz_job, job_id)
+
+
+def submit_quiz_batch(youtube_urls: list, user, use_quiz_cache: bool = True, playlist_url: str = "") -> QuizBatch:
+    """Create a batch with one pending job per URL and feed them into the stage pipeline on commit."""
+    batch = QuizBatch.objects.create(created_by=user, playlist_url=playlist_url)
+    jobs = QuizJob.objects.bulk_create(
+        QuizJob(batch=batch, video_url=url, created_by=user, use_quiz_cache=use_quiz_cache) for url in youtube_urls
+    )
+    job_ids = [job.pk for job in jobs]
+    transaction.on_commit(lambda: _start_batch(job_ids))
+    return batch
+
+
+def _start_batch(job_ids: list) -> None:
+    """Queue every job of a batch for the fetch stage, in submission order."""
+    _track_jobs(job_ids)
+    executor = _get_stage_executor(FETCH)
+    for job_id in job_ids:
+        executor.submit(_fetch_stage, job_id)
+
+
+def _update_job(job_id: int, **fields) -> None:
+    """Write job fields without touching the rest of the row."""
+    QuizJob.objects.filter(pk=job_id).update(updated_at=timezone.now(), **fields)
+
+
+def _job_reporters(job_id: int):
+    """Return (on_stage, on_progress) callbacks that record stage and percent done on the job.
+
+    Progress is written only when the whole percentage changes, and at most
+    once per PROGRESS_WRITE_INTERVAL_SECONDS unless the stage is complete.
+    """
+    last = {"percent": 0, "written_at": 0.0}
+
+    def on_stage(stage: str) -> None:
+        last.update(percent=0, written_at=time.monotonic())
+        _update_job(job_id, stage=stage, progress=0)
+
+    def on_progress(fraction: float) -> None:
+        percent = int(fraction * 100)
+        now = time.monotonic()
+        if percent == last["percent"]:
+            return
+        if percent < 100 and now - last["written_at"] < PROGRESS_WRITE_INTERVAL_SECONDS:
+            return
+        last.update(percent=percent, written_at=now)
+        _update_job(job_id, progress=percent)
+
+    return on_stage, on_progress
+
+
+def _claim_job(job_id: int):
+    """Mark an unfinished job running and return it with its creator, or None if it was deleted or finished."""
+    claimed = QuizJob.objects.filter(pk=job_id, status__in=UNFINISHED).update(
+        status=QuizJob.Status.RUNNING, updated_at=timezone.now()
+    )
+    if not claimed:
+        logger.info("Quiz job %s was deleted or has finished, skipping it", job_id)
+        connections.close_all()
+        return None
+    return QuizJob.objects.select_related("created_by").get(pk=job_id)
+
+
+@contextmanager
+def _job_step(job_id: int):
+    """Run one pipeline step of a job and record a failure if the step raises."""
+    try:
+        yield
+    except ValueError as exc:
+        _update_job(job_id, status=QuizJob.Status.FAILED, error=str(exc))
+    except Exception as exc:
+        logger.exception("Quiz job %s failed unexpectedly", job_id)
+        _update_job(job_id, status=QuizJob.Status.FAILED, error=f"Unexpected error: {exc}")
+    finally:
+        connections.close_all()
+
+
+def run_quiz_job(job_id: int) -> None:
+    """Run the creation pipeline for a job and record its outcome."""
+    job = _claim_job(job_id)
+    if job is None:
+        return
+    with _job_step(job_id):
+        on_stage, on_progress = _job_reporters(job_id)
+        quiz = create_quiz_from_youtube(
+            job.video_url,
+            job.created_by,
+            on_stage=on_stage,
+            use_quiz_cache=job.use_quiz_cache,
+            on_progress=on_progress,
+        )
+        _update_job(job_id, status=QuizJob.Status.SUCCEEDED, stage=QuizJob.Stage.DONE, progress=100, quiz=quiz)
+
+
+def _release_audio(audio_dir: str) -> None:
+    """Delete a fetched audio directory and free its slot."""
+    shutil.rmtree(audio_dir, ignore_errors=True)
+    _audio_slots.release()
+
+
+def _fetch_stage(job_id: int) -> None:
+    """Batch stage 1: reuse a cached or caption transcript, otherwise download the audio."""
+    job = _claim_job(job_id)
+    if job is None:
+        return
+    with _job_step(job_id):
+        result = lookup_transcript(job.video_url)
+        if result is not None:
+            _get_stage_executor(GENERATE).submit(_generate_stage, job_id, result)
+            return
+        _audio_slots.acquire()
+        audio_dir = tempfile.mkdtemp(prefix="quizly-")
+        try:
+            audio = fetch_audio(job.video_url, audio_dir, *_job_reporters(job_id))
+        except BaseException:
+            _release_audio(audio_dir)
+            raise
+        _get_stage_executor(TRANSCRIBE).submit(_transcribe_stage, job_id, audio, audio_dir)
+
+
+def _transcribe_stage(job_id: int, audio, audio_dir: str) -> None:
+    """Batch stage 2: transcribe the fetched audio with Whisper."""
+    try:
+        job = _claim_job(job_id)
+        if job is None:
+            return
+        with _job_step(job_id):
+            result = transcribe_fetched_audio(job.video_url, audio, *_job_reporters(job_id))
+            _get_stage_executor(GENERATE).submit(_generate_stage, job_id, result)
+    finally:
+        _release_audio(audio_dir)
+
+
+def _generate_stage(job_id: int, result: tuple) -> None:
+    """Batch stage 3: generate the quiz with Gemini and save it."""
+    job = _claim_job(job_id)
+    if job is None:
+        return
+    with _job_step(job_id):
+        on_stage, _ = _job_reporters(job_id)
+        quiz = build_quiz(job.video_url, job.created_by, *result, on_stage=on_stage, use_quiz_cache=job.use_quiz_cache)
+        _update_job(job_id, status=QuizJob.Status.SUCCEEDED, stage=QuizJob.Stage.DONE, progress=100, quiz=quiz)
+
+
+def touch_queued_jobs() -> int:
+    """Refresh ``updated_at`` of the unfinished jobs queued in this process and forget finished ones."""
+    with _queued_jobs_lock:
+        job_ids = list(_queued_jobs)
+    if not job_ids:
+        return 0
+    unfinished = QuizJob.objects.filter(pk__in=job_ids, status__in=UNFINISHED)
+    touched = unfinished.update(updated_at=timezone.now())
+    finished = set(job_ids) - set(unfinished.values_list("pk", flat=True))
+    with _queued_jobs_lock:
+        _queued_jobs.difference_update(finished)
+    return touched
+
+
+def fail_stale_jobs(stale_seconds: float = QUIZ_JOB_STALE_SECONDS) -> int:
+    """Mark pending and running jobs without an update for ``stale_seconds`` as failed; return how many."""
+    now = timezone.now()
+    return QuizJob.objects.filter(
+        status__in=UNFINISHED, updated_at__lt=now - timedelta(seconds=stale_seconds),
+    ).update(status=QuizJob.Status.FAILED, error=STALE_JOB_ERROR, updated_at=now)
+
+
+def _sweep_periodically() -> None:
+    """Refresh this process's queued jobs, then fail stale ones, every QUIZ_JOB_SWEEP_INTERVAL_SECONDS."""
+    while True:
+        time.sleep(QUIZ_JOB_SWEEP_INTERVAL_SECONDS)
+        try:
+            touch_queued_jobs()
+            failed = fail_stale_jobs()
+            if failed:
+                logger.warning("Marked %d stale quiz jobs as failed", failed)
+        except DatabaseError:
+            logger.exception("Failing stale quiz jobs failed")
+        finally:
+            connections.close_all()
+
+
+def start_stale_job_sweep() -> None:
+    """Start the stale-job sweep thread of this process unless QUIZ_JOB_SWEEP_INTERVAL_SECONDS is 0."""
+    if QUIZ_JOB_SWEEP_INTERVAL_SECONDS > 0:
+        threading.Thread(target=_sweep_periodically, name="quiz-job-sweep", daemon=True).start()
@@ -0,0 +1,75 @@
+"""
+Compare CPU time and temporary disk usage of the mp3 and pcm audio modes.
+
+The input should be a native YouTube audio stream (e.g. .webm/.m4a as
+downloaded by yt-dlp with WHISPER_AUDIO_MODE=pcm).
+
+Usage:
+    python manage.py bench_audio_decode stream.webm --runs 3
+"""
+
+import os
+import resource
+import shutil
+import statistics
+import tempfile
+
+import ffmpeg
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.audio import load_pcm, probe_duration
+
+
+def _child_cpu_seconds() -> float:
+    """Return user + system CPU time consumed by finished child processes (ffmpeg)."""
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Command(BaseCommand):
+    help = "Benchmark the mp3 re-encode path against decoding the native stream once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("audio_path")
+        parser.add_argument("--runs", type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            minutes = probe_duration(options["audio_path"]) / 60
+        except Exception as exc:
+            raise CommandError(f"Could not read {options['audio_path']}: {exc}") from exc
+        source_bytes = os.path.getsize(options["audio_path"])
+
+        mp3_runs = [self._mp3_path(options["audio_path"]) for _ in range(options["runs"])]
+        pcm_runs = [self._pcm_path(options["audio_path"]) for _ in range(options["runs"])]
+        mp3_cpu = statistics.median(cpu for cpu, _ in mp3_runs)
+        pcm_cpu = statistics.median(cpu for cpu, _ in pcm_runs)
+        mp3_disk = source_bytes + mp3_runs[0][1]
+        pcm_disk = source_bytes
+
+        self.stdout.write(f"Audio: {minutes:.1f} min, source stream {source_bytes / 1024 ** 2:.1f} MB")
+        self.stdout.write(f"{'mode':<6}{'CPU s/min':>12}{'peak temp MB/min':>20}")
+        self.stdout.write(f"{'mp3':<6}{mp3_cpu / minutes:>12.2f}{mp3_disk / 1024 ** 2 / minutes:>20.2f}")
+        self.stdout.write(f"{'pcm':<6}{pcm_cpu / minutes:>12.2f}{pcm_disk / 1024 ** 2 / minutes:>20.2f}")
+        self.stdout.write(
+            f"Saved per minute of audio: {(mp3_cpu - pcm_cpu) / minutes:.2f} CPU s, "
+            f"{(mp3_disk - pcm_disk) / 1024 ** 2 / minutes:.2f} MB temporary disk"
+        )
+
+    def _mp3_path(self, audio_path: str) -> tuple:
+        """Transcode to 128 kbps mp3 like FFmpegExtractAudio, then decode it like Whisper does."""
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            mp3_path = os.path.join(tmp_dir, "audio.mp3")
+            started = _child_cpu_seconds()
+            ffmpeg.input(audio_path).output(mp3_path, audio_bitrate="128k", vn=None).run(quiet=True)
+            load_pcm(mp3_path)
+            return _child_cpu_seconds() - started, os.path.getsize(mp3_path)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def _pcm_path(self, audio_path: str) -> tuple:
+        """Decode the native stream once into Whisper samples."""
+        started = _child_cpu_seconds()
+        load_pcm(audio_path)
+        return _child_cpu_seconds() - started, 0
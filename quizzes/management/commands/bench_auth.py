@@ -0,0 +1,107 @@
+"""
+Measure authenticated GETs per second with and without the user cache.
+
+Requests go straight to the quiz detail view (no middleware or server), so
+the numbers show the cost of resolving the user on top of a warm quiz read:
+
+    python manage.py bench_auth --duration 5
+
+Modes: ``db`` loads the user on every request, ``cache`` uses the user
+cache, ``claims`` builds the user from the token (AUTH_CLAIMS_ONLY=True).
+The run uses a new throwaway user, which is deleted with its quiz afterwards.
+"""
+
+import secrets
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from quizzes.api.views import QuizDetailView
+from quizzes.models import Question, QuestionOption, Quiz
+from users import authentication
+from users.user_cache import user_cache
+from users.utils import generate_tokens_for_user
+
+BENCH_USERNAME = "bench-auth"
+MODES = ("db", "cache", "claims")
+
+
+@contextmanager
+def _auth_mode(mode: str):
+    """Configure user resolution for ``mode`` and restore the settings afterwards."""
+    claims_only, ttl_seconds = authentication.AUTH_CLAIMS_ONLY, user_cache.ttl_seconds
+    authentication.AUTH_CLAIMS_ONLY = mode == "claims"
+    user_cache.ttl_seconds = 0 if mode == "db" else max(ttl_seconds, 60)
+    user_cache.clear()
+    try:
+        yield
+    finally:
+        authentication.AUTH_CLAIMS_ONLY, user_cache.ttl_seconds = claims_only, ttl_seconds
+        user_cache.clear()
+
+
+class Command(BaseCommand):
+    help = "Benchmark authenticated quiz detail GETs per second by user resolution mode."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", default=",".join(MODES))
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per mode.")
+
+    def handle(self, *args, **options):
+        modes = options["modes"].split(",")
+        if any(mode not in MODES for mode in modes):
+            raise CommandError(f"Modes must be among: {', '.join(MODES)}")
+
+        user = User.objects.create_user(f"{BENCH_USERNAME}-{secrets.token_hex(6)}", "bench-auth@example.com")
+        try:
+            self._run(user, modes, options["duration"])
+        finally:
+            user.delete()
+
+    def _run(self, user, modes: list, duration: float) -> None:
+        """Benchmark every mode against a quiz of ``user`` and print the table."""
+        quiz, token = self._prepare(user)
+        view = QuizDetailView.as_view()
+        factory = RequestFactory()
+
+        def get():
+            request = factory.get(f"/api/quizzes/{quiz.pk}/")
+            request.COOKIES["access_token"] = token
+            response = view(request, pk=quiz.pk)
+            if response.status_code != 200:
+                raise CommandError(f"GET returned {response.status_code}: {response.data}")
+
+        self.stdout.write(f"{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'queries':>9}")
+        results = {}
+        for mode in modes:
+            with _auth_mode(mode):
+                get()
+                with CaptureQueriesContext(connection) as captured:
+                    get()
+                latencies = []
+                deadline = time.perf_counter() + duration
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    get()
+                    latencies.append(time.perf_counter() - started)
+            latencies.sort()
+            results[mode] = len(latencies) / duration
+            self.stdout.write(
+                f"{mode:<8}{results[mode]:>10.1f}{latencies[len(latencies) // 2] * 1000:>10.2f}"
+                f"{len(captured.captured_queries):>9}"
+            )
+        if "db" in results:
+            for mode in [mode for mode in results if mode != "db"]:
+                self.stdout.write(f"{mode} / db: {results[mode] / results['db']:.2f}x")
+
+    def _prepare(self, user) -> tuple:
+        """Create a quiz for the benchmark user and return it with an access token."""
+        quiz = Quiz.objects.create(title="Benchmark quiz", video_url="https://youtu.be/dQw4w9WgXcQ", created_by=user)
+        question = Question.objects.create(quiz=quiz, question_title="Question?", answer="A")
+        QuestionOption.objects.bulk_create(QuestionOption(question=question, text=text) for text in "ABCD")
+        return quiz, generate_tokens_for_user(user)[0]
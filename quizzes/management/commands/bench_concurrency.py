@@ -0,0 +1,108 @@
+"""
+Compare concurrent GET throughput of a WSGI and an ASGI deployment.
+
+Start both servers with one worker process against the same database, the
+ASGI one with the async views enabled, then point the benchmark at them:
+
+    gunicorn core.wsgi --workers 1 --threads 8 --bind 127.0.0.1:8001
+    ASYNC_VIEWS=True uvicorn core.asgi:application --workers 1 --port 8002
+    python manage.py bench_concurrency wsgi=http://127.0.0.1:8001 asgi=http://127.0.0.1:8002
+
+The command creates a benchmark user with ``--quizzes`` quizzes and sends
+authenticated GET requests from an increasing number of concurrent clients.
+"""
+
+import asyncio
+import time
+
+import httpx
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.models import Question, QuestionOption, Quiz
+from users.utils import generate_tokens_for_user
+
+BENCH_USERNAME = "bench-concurrency"
+
+
+async def _client_loop(client: httpx.AsyncClient, path: str, deadline: float, latencies: list, errors: list):
+    """Send GET requests back to back until the deadline."""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(response.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+
+
+async def _run_level(base_url: str, path: str, token: str, concurrency: int, duration: float) -> dict:
+    """Run ``concurrency`` clients for ``duration`` seconds and summarize the responses."""
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, cookies={"access_token": token}, limits=limits, timeout=30
+    ) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            _client_loop(client, path, deadline, latencies, errors) for _ in range(concurrency)
+        ))
+    latencies.sort()
+    return {
+        "rps": len(latencies) / duration,
+        "p50": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+        "errors": len(errors),
+    }
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent quiz GETs served per worker under WSGI and ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument("targets", nargs="+", help="name=base_url pairs, e.g. wsgi=http://127.0.0.1:8001")
+        parser.add_argument("--concurrency", default="1,10,50,100,200")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency level.")
+        parser.add_argument("--path", default="/api/quizzes/?fields=summary")
+        parser.add_argument("--quizzes", type=int, default=50)
+
+    def handle(self, *args, **options):
+        try:
+            targets = [target.split("=", 1) for target in options["targets"]]
+            levels = [int(level) for level in options["concurrency"].split(",")]
+        except ValueError as exc:
+            raise CommandError(f"Invalid arguments: {exc}") from exc
+        if any(len(target) != 2 for target in targets):
+            raise CommandError("Targets must be given as name=base_url.")
+
+        token = self._prepare_user(options["quizzes"])
+        self.stdout.write(f"GET {options['path']}, {options['duration']:.0f}s per level")
+        self.stdout.write(f"{'server':<8}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        best = {}
+        for name, base_url in targets:
+            for level in levels:
+                result = asyncio.run(_run_level(base_url, options["path"], token, level, options["duration"]))
+                best[name] = max(best.get(name, 0.0), result["rps"])
+                self.stdout.write(
+                    f"{name:<8}{level:>8}{result['rps']:>10.1f}{result['p50'] * 1000:>10.1f}"
+                    f"{result['p95'] * 1000:>10.1f}{result['errors']:>8}"
+                )
+        self.stdout.write("Peak req/s per worker: " + ", ".join(f"{name} {rps:.1f}" for name, rps in best.items()))
+        if len(best) == 2 and min(best.values()) > 0:
+            (first, first_rps), (second, second_rps) = best.items()
+            self.stdout.write(f"{second} / {first}: {second_rps / first_rps:.2f}x")
+
+    def _prepare_user(self, quiz_count: int) -> str:
+        """Create the benchmark user with ``quiz_count`` quizzes and return an access token."""
+        user, _ = User.objects.get_or_create(username=BENCH_USERNAME, defaults={"email": "bench@example.com"})
+        missing = quiz_count - user.quizzes.count()
+        for i in range(max(missing, 0)):
+            quiz = Quiz.objects.create(
+                title=f"Benchmark quiz {i}", video_url="https://youtu.be/dQw4w9WgXcQ", created_by=user
+            )
+            question = Question.objects.create(quiz=quiz, question_title="Question?", answer="A")
+            QuestionOption.objects.bulk_create(QuestionOption(question=question, text=text) for text in "ABCD")
+        return generate_tokens_for_user(user)[0]
@@ -0,0 +1,64 @@
+"""
+Compare wall-clock time of single-pass and chunked parallel Whisper transcription.
+
+Usage:
+    python manage.py bench_transcription lecture.mp3 --runs 3 --segment-seconds 300 --workers 4
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes import parallel_transcription
+from quizzes.audio import probe_duration
+from quizzes.utils import _transcribe_single_pass
+from quizzes.whisper_models import WHISPER_MODEL_SIZE, model_registry
+
+
+class Command(BaseCommand):
+    help = "Benchmark single-pass against chunked parallel transcription on a local audio file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("audio_path")
+        parser.add_argument("--runs", type=int, default=3)
+        parser.add_argument("--segment-seconds", type=int, default=parallel_transcription.WHISPER_CHUNK_SECONDS)
+        parser.add_argument("--overlap-seconds", type=int, default=parallel_transcription.WHISPER_CHUNK_OVERLAP_SECONDS)
+        parser.add_argument("--workers", type=int, default=parallel_transcription.WHISPER_CHUNK_WORKERS)
+
+    def handle(self, *args, **options):
+        try:
+            duration = probe_duration(options["audio_path"])
+        except Exception as exc:
+            raise CommandError(f"Could not read {options['audio_path']}: {exc}") from exc
+        parallel_transcription.WHISPER_CHUNK_SECONDS = options["segment_seconds"]
+        parallel_transcription.WHISPER_CHUNK_OVERLAP_SECONDS = options["overlap_seconds"]
+        parallel_transcription.WHISPER_CHUNK_WORKERS = options["workers"]
+        model_registry.preload(WHISPER_MODEL_SIZE)
+
+        self.stdout.write(f"Audio: {duration:.0f}s, model: {WHISPER_MODEL_SIZE}, workers: {options['workers']}")
+        self.stdout.write("Warming up worker processes (model load is excluded from timings)...")
+        parallel_transcription.transcribe_in_chunks(options["audio_path"], duration)
+
+        single = self._time(options["runs"], lambda: _transcribe_single_pass(options["audio_path"]))
+        chunked = self._time(
+            options["runs"], lambda: parallel_transcription.transcribe_in_chunks(options["audio_path"], duration)
+        )
+        self._report("single-pass", single, duration)
+        self._report("chunked", chunked, duration)
+        self.stdout.write(f"Speed-up: {statistics.median(single) / statistics.median(chunked):.2f}x")
+
+    def _time(self, runs: int, func) -> list:
+        """Return the wall-clock seconds of ``runs`` calls to ``func``."""
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    def _report(self, label: str, timings: list, duration: float) -> None:
+        median = statistics.median(timings)
+        self.stdout.write(
+            f"{label:<12} median {median:8.2f}s  min {min(timings):8.2f}s  real-time factor {median / duration:.3f}"
+        )
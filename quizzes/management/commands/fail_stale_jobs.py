@@ -0,0 +1,24 @@
+"""
+Mark quiz jobs that were queued or running in a stopped process as failed.
+
+Jobs run on thread pools inside the server process, so a restart or crash
+leaves them pending or running forever. Run this before starting the server;
+when no other server process is running, every unfinished job is orphaned:
+
+    python manage.py fail_stale_jobs --stale-seconds 0
+"""
+
+from django.core.management.base import BaseCommand
+
+from quizzes.jobs import QUIZ_JOB_STALE_SECONDS, fail_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Mark pending and running quiz jobs without a recent update as failed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stale-seconds", type=float, default=QUIZ_JOB_STALE_SECONDS)
+
+    def handle(self, *args, **options):
+        failed = fail_stale_jobs(options["stale_seconds"])
+        self.stdout.write(self.style.SUCCESS(f"Marked {failed} stale quiz jobs as failed."))
@@ -0,0 +1,299 @@
+"""
+End-to-end load test of quiz creation and listing without YouTube or Gemini.
+
+``download_audio``, ``transcribe_audio`` and ``_call_gemini`` are replaced
+by local stand-ins that sleep for a configurable latency and return valid
+data, so every POST runs the real job pipeline (job rows, transcript cache,
+quiz validation, saving) and every GET the real list view. Concurrent
+clients send requests through Django's test client, i.e. the full URL
+routing, middleware and cookie authentication, in this process:
+
+    python manage.py loadtest --clients 20 --duration 30 --post-ratio 0.1 --output loadtest.json
+
+Latency percentiles, requests per second and database queries per request
+are printed and written to ``--output`` as JSON, together with the end-to-end
+time of the queued jobs, so runs can be compared over time. Quiz jobs run on
+the QUIZ_WORKERS pool of this process; jobs still queued after ``--drain-timeout``
+are cancelled before the stand-ins are removed. The run uses a new throwaway
+user, and all rows it created (including cache entries) are deleted afterwards.
+"""
+
+import hashlib
+import json
+import os
+import random
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from quizzes.gemini import GEMINI_API_KEY
+from quizzes.jobs import QUIZ_WORKERS, shutdown_job_executor
+from quizzes.models import CachedQuizData, CachedTranscript, QuizJob
+from quizzes.schemas import OPTIONS_PER_QUESTION, FactsSchema, QuestionRepairSchema
+from quizzes.utils import QUIZ_MIN_QUESTIONS, save_quiz_to_db
+from users.utils import generate_tokens_for_user
+
+LOADTEST_USERNAME = "loadtest"
+LIST_PATH = "/api/quizzes/"
+GET, POST = f"GET {LIST_PATH}", f"POST {LIST_PATH}"
+PERCENTILES = (50, 95, 99)
+
+
+class StandIns:
+    """Local replacements for the external calls of the pipeline, with jittered latency."""
+
+    def __init__(self, download_ms: float, transcribe_ms: float, gemini_ms: float, jitter: float, words: int):
+        self.download_ms, self.transcribe_ms, self.gemini_ms = download_ms, transcribe_ms, gemini_ms
+        self.jitter = jitter
+        self.transcript = " ".join(f"word{i % 500}" for i in range(words))
+
+    def _wait(self, milliseconds: float) -> None:
+        """Sleep for ``milliseconds`` ± the jitter fraction."""
+        time.sleep(milliseconds / 1000 * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def download_audio(self, youtube_url: str, output_dir: str, on_progress=None) -> str:
+        """Write an empty audio file after the download latency."""
+        self._wait(self.download_ms)
+        path = os.path.join(output_dir, "audio.mp3")
+        open(path, "wb").close()
+        if on_progress is not None:
+            on_progress(1.0)
+        return path
+
+    def transcribe_audio(self, audio, on_progress=None) -> str:
+        """Return the fixed transcript after the transcription latency."""
+        self._wait(self.transcribe_ms)
+        if on_progress is not None:
+            on_progress(1.0)
+        return self.transcript
+
+    def call_gemini(self, prompt: str, schema) -> str:
+        """Return JSON of the requested schema after the Gemini latency."""
+        self._wait(self.gemini_ms)
+        if schema is FactsSchema:
+            return json.dumps({"facts": ["A fact from the transcript."]})
+        data = _quiz_data()
+        if schema is QuestionRepairSchema:
+            return json.dumps({"questions": data["questions"]})
+        return json.dumps(data)
+
+    @contextmanager
+    def installed(self):
+        """Route the pipeline in ``quizzes.utils`` through the stand-ins (no captions, mp3 mode)."""
+        with mock.patch.multiple(
+            "quizzes.utils",
+            download_audio=self.download_audio,
+            transcribe_audio=self.transcribe_audio,
+            _call_gemini=self.call_gemini,
+            CAPTIONS_ENABLED=False,
+            WHISPER_AUDIO_MODE="mp3",
+            GEMINI_API_KEY=GEMINI_API_KEY or "loadtest",
+        ):
+            yield
+
+
+def _quiz_data() -> dict:
+    """Return a valid quiz as Gemini would generate it."""
+    questions = [
+        {
+            "question_title": f"Question {i + 1}?",
+            "question_options": [f"Option {option}" for option in "ABCDEFGH"[:OPTIONS_PER_QUESTION]],
+            "answer": "Option A",
+        }
+        for i in range(max(QUIZ_MIN_QUESTIONS, 10))
+    ]
+    return {"title": "Load test quiz", "description": "Generated by the load test.", "questions": questions}
+
+
+def _video_id() -> str:
+    """Return a new random 11-character video id, so the transcript cache always misses."""
+    return "lt" + secrets.token_hex(5)[:9]
+
+
+def _host() -> str:
+    """Return a host name accepted by ALLOWED_HOSTS."""
+    hosts = [host.lstrip(".") for host in settings.ALLOWED_HOSTS if host and host != "*"]
+    return hosts[0] if hosts else "localhost"
+
+
+def _client_loop(token: str, deadline: float, post_ratio: float, seed: int) -> list:
+    """Send requests until the deadline; return (endpoint, status, seconds, queries, job id) per request."""
+    client = Client(HTTP_HOST=_host())
+    client.cookies["access_token"] = token
+    rng = random.Random(seed)
+    samples = []
+    try:
+        while time.perf_counter() < deadline:
+            endpoint = POST if rng.random() < post_ratio else GET
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                if endpoint == POST:
+                    body = {"url": f"https://youtu.be/{_video_id()}", "fresh": True}
+                    response = client.post(LIST_PATH, body, content_type="application/json")
+                else:
+                    response = client.get(LIST_PATH)
+                elapsed = time.perf_counter() - started
+            job_id = response.json().get("id") if endpoint == POST and response.status_code == 202 else None
+            samples.append((endpoint, response.status_code, elapsed, len(captured.captured_queries), job_id))
+    finally:
+        connections.close_all()
+    return samples
+
+
+def _percentiles(values: list) -> dict:
+    """Return the nearest-rank p50/p95/p99 of ``values`` in milliseconds."""
+    values = sorted(values)
+    if not values:
+        return {f"p{p}_ms": None for p in PERCENTILES}
+    return {f"p{p}_ms": round(values[min(len(values) - 1, len(values) * p // 100)] * 1000, 2) for p in PERCENTILES}
+
+
+def _summarize(samples: list, duration: float) -> dict:
+    """Return request statistics of one endpoint."""
+    ok = [sample for sample in samples if sample[1] < 400]
+    queries = [sample[3] for sample in samples]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "rps": round(len(ok) / duration, 2),
+        **_percentiles([sample[2] for sample in ok]),
+        "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+        "queries_max": max(queries, default=None),
+    }
+
+
+class Command(BaseCommand):
+    help = "Load-test POST/GET /api/quizzes/ with stand-ins for yt-dlp, Whisper and Gemini and write JSON results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=10)
+        parser.add_argument("--duration", type=float, default=20.0)
+        parser.add_argument("--post-ratio", type=float, default=0.1, help="Share of requests that create a quiz.")
+        parser.add_argument("--quizzes", type=int, default=20, help="Quizzes the test user owns before the run.")
+        parser.add_argument("--download-ms", type=float, default=200.0)
+        parser.add_argument("--transcribe-ms", type=float, default=1000.0)
+        parser.add_argument("--gemini-ms", type=float, default=1500.0)
+        parser.add_argument("--jitter", type=float, default=0.2, help="Latency varies by ± this fraction.")
+        parser.add_argument("--transcript-words", type=int, default=2000)
+        parser.add_argument(
+            "--drain-timeout", type=float, default=120.0, help="Seconds to wait for queued jobs before cancelling them."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default="loadtest.json")
+
+    def handle(self, *args, **options):
+        if not 0 <= options["post_ratio"] <= 1 or not 0 <= options["jitter"] < 1:
+            raise CommandError("--post-ratio must be within [0, 1] and --jitter within [0, 1).")
+        stand_ins = StandIns(
+            options["download_ms"], options["transcribe_ms"], options["gemini_ms"],
+            options["jitter"], options["transcript_words"],
+        )
+        user = User.objects.create_user(f"{LOADTEST_USERNAME}-{secrets.token_hex(6)}", "loadtest@example.com")
+        token = generate_tokens_for_user(user)[0]
+        created_after = timezone.now()
+        try:
+            self._seed_quizzes(user, options["quizzes"])
+            with stand_ins.installed():
+                try:
+                    started_at = timezone.now()
+                    samples, drained = self._run(token, options)
+                finally:
+                    # Jobs must not outlive the stand-ins and reach YouTube, Whisper or Gemini.
+                    shutdown_job_executor(cancel_pending=True)
+            report = self._report(samples, options, started_at, drained)
+        finally:
+            video_ids = list(user.quiz_jobs.values_list("video_url", flat=True))
+            CachedTranscript.objects.filter(video_id__in=[url.rsplit("/", 1)[-1] for url in video_ids]).delete()
+            CachedQuizData.objects.filter(
+                transcript_hash=hashlib.sha256(stand_ins.transcript.encode()).hexdigest(),
+                created_at__gte=created_after,
+            ).delete()
+            user.delete()
+
+        with open(options["output"], "w") as output:
+            json.dump(report, output, indent=2)
+        self._print(report)
+        self.stdout.write(f"Results written to {options['output']}")
+
+    def _seed_quizzes(self, user, count: int) -> None:
+        """Give the user ``count`` quizzes for the list endpoint to return."""
+        for _ in range(count):
+            save_quiz_to_db(_quiz_data(), f"https://youtu.be/{_video_id()}", user)
+
+    def _run(self, token: str, options: dict) -> tuple:
+        """Run the clients, then wait for their jobs; return the samples and whether all jobs finished."""
+        deadline = time.perf_counter() + options["duration"]
+        with ThreadPoolExecutor(max_workers=options["clients"]) as pool:
+            futures = [
+                pool.submit(_client_loop, token, deadline, options["post_ratio"], options["seed"] + i)
+                for i in range(options["clients"])
+            ]
+            samples = [sample for future in futures for sample in future.result()]
+
+        job_ids = [sample[4] for sample in samples if sample[4] is not None]
+        unfinished = QuizJob.objects.filter(pk__in=job_ids, status__in=[QuizJob.Status.PENDING, QuizJob.Status.RUNNING])
+        drain_deadline = time.perf_counter() + options["drain_timeout"]
+        while unfinished.exists():
+            if time.perf_counter() > drain_deadline:
+                return samples, False
+            time.sleep(0.2)
+        return samples, True
+
+    def _report(self, samples: list, options: dict, started_at, drained: bool) -> dict:
+        """Build the JSON report of a run."""
+        duration = options["duration"]
+        jobs = QuizJob.objects.filter(pk__in=[sample[4] for sample in samples if sample[4] is not None])
+        finished = list(jobs.exclude(status__in=[QuizJob.Status.PENDING, QuizJob.Status.RUNNING]).values_list(
+            "status", "created_at", "updated_at",
+        ))
+        succeeded = [(created, updated) for status, created, updated in finished if status == QuizJob.Status.SUCCEEDED]
+        wall_seconds = (max((updated for _, updated in succeeded), default=started_at) - started_at).total_seconds()
+        return {
+            "timestamp": started_at.isoformat(),
+            "database": connection.vendor,
+            "config": {
+                key: options[key] for key in (
+                    "clients", "duration", "post_ratio", "quizzes", "download_ms", "transcribe_ms",
+                    "gemini_ms", "jitter", "transcript_words", "seed",
+                )
+            } | {"quiz_workers": QUIZ_WORKERS},
+            "endpoints": {
+                endpoint: _summarize([sample for sample in samples if sample[0] == endpoint], duration)
+                for endpoint in (GET, POST)
+            },
+            "jobs": {
+                "queued": jobs.count(),
+                "succeeded": len(succeeded),
+                "failed": len(finished) - len(succeeded),
+                "drained": drained,
+                "per_second": round(len(succeeded) / wall_seconds, 2) if wall_seconds > 0 else None,
+                **_percentiles([(updated - created).total_seconds() for created, updated in succeeded]),
+            },
+        }
+
+    def _print(self, report: dict) -> None:
+        """Print the report as a table."""
+        header = f"{'endpoint':<22}{'req':>7}{'err':>6}{'req/s':>9}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+        self.stdout.write(header + f"{'queries':>9}")
+        for endpoint, stats in report["endpoints"].items():
+            self.stdout.write(
+                f"{endpoint:<22}{stats['requests']:>7}{stats['errors']:>6}{stats['rps']:>9.1f}"
+                + "".join(f"{stats[f'p{p}_ms'] or 0:>10.1f}" for p in PERCENTILES)
+                + f"{stats['queries_mean'] or 0:>9.1f}"
+            )
+        jobs = report["jobs"]
+        self.stdout.write(
+            f"jobs: {jobs['succeeded']}/{jobs['queued']} succeeded, {jobs['failed']} failed, "
+            f"{jobs['per_second'] or 0:.2f}/s, end-to-end p50 {jobs['p50_ms'] or 0:.0f} ms, p95 {jobs['p95_ms'] or 0:.0f} ms"
+            + ("" if jobs["drained"] else " (drain timeout: queued jobs were cancelled)")
+        )
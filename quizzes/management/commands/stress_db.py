@@ -0,0 +1,121 @@
+"""
+Stress the configured database with concurrent quiz writes and API reads.
+
+Writer threads save quizzes the way the pipeline does (one transaction per
+quiz) and update job progress; reader threads load quiz list pages and
+serialized quizzes. Every "database is locked" error is counted and makes
+the command fail, so it can check the SQLite profile from settings:
+
+    python manage.py stress_db --writers 4 --readers 16 --duration 20
+
+Compare with SQLite's defaults by overriding the profile, e.g.
+``SQLITE_JOURNAL_MODE=DELETE SQLITE_TRANSACTION_MODE=DEFERRED SQLITE_BUSY_TIMEOUT_SECONDS=0``.
+The run uses a new throwaway user, and all rows it created are deleted afterwards.
+"""
+
+import secrets
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+
+from quizzes.api.pagination import QuizCursorPagination
+from quizzes.api.payload_cache import quiz_payloads
+from quizzes.models import QuizJob
+from quizzes.utils import save_quiz_to_db
+
+STRESS_USERNAME = "stress-db"
+QUESTION = {"question_title": "Question?", "question_options": ["A", "B", "C", "D"], "answer": "A"}
+
+
+class _Counters:
+    """Operation and error counts shared by the worker threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"writes": 0, "reads": 0, "lock_errors": 0, "other_errors": 0}
+
+    def inc(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+
+def _run(operation, counters: _Counters, deadline: float, kind: str) -> None:
+    """Repeat ``operation`` until the deadline, counting successes and database errors."""
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                operation()
+                counters.inc(kind)
+            except OperationalError as exc:
+                counters.inc("lock_errors" if "locked" in str(exc) else "other_errors")
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run concurrent quiz writes and reads against the database and fail on lock errors."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=20.0)
+        parser.add_argument("--questions", type=int, default=10, help="Questions per written quiz.")
+
+    def handle(self, *args, **options):
+        self._describe_profile()
+        user = User.objects.create_user(f"{STRESS_USERNAME}-{secrets.token_hex(6)}", "stress@example.com")
+        data = {"title": "Stress quiz", "description": "", "questions": [QUESTION] * options["questions"]}
+
+        def write():
+            save_quiz_to_db(data, job.video_url, user)
+            QuizJob.objects.filter(pk=job.pk).update(progress=(job.pk + time.monotonic_ns()) % 100)
+
+        def read():
+            page = list(user.quizzes.order_by(*QuizCursorPagination.ordering)[:QuizCursorPagination.page_size])
+            quiz_payloads(page[:1])
+            QuizJob.objects.filter(pk=job.pk).values("status", "stage", "progress").first()
+
+        counters = _Counters()
+        deadline = time.perf_counter() + options["duration"]
+        threads = [
+            threading.Thread(target=_run, args=(write, counters, deadline, "writes"))
+            for _ in range(options["writers"])
+        ] + [
+            threading.Thread(target=_run, args=(read, counters, deadline, "reads"))
+            for _ in range(options["readers"])
+        ]
+        try:
+            job = QuizJob.objects.create(video_url="https://youtu.be/dQw4w9WgXcQ", created_by=user)
+            save_quiz_to_db(data, job.video_url, user)
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            user.delete()
+
+        counts = counters.counts
+        self.stdout.write(
+            f"writes/s {counts['writes'] / options['duration']:.1f}  reads/s {counts['reads'] / options['duration']:.1f}"
+            f"  lock errors {counts['lock_errors']}  other errors {counts['other_errors']}"
+        )
+        if counts["lock_errors"]:
+            raise CommandError(f"{counts['lock_errors']} operations failed with 'database is locked'.")
+
+    def _describe_profile(self) -> None:
+        """Print the database vendor and, for SQLite, the effective connection settings."""
+        if connection.vendor != "sqlite":
+            self.stdout.write(f"Database: {connection.vendor}")
+            return
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for pragma in ("journal_mode", "synchronous", "busy_timeout", "mmap_size"):
+                cursor.execute(f"PRAGMA {pragma}")
+                pragmas[pragma] = cursor.fetchone()[0]
+        self.stdout.write(
+            "SQLite: " + ", ".join(f"{key}={value}" for key, value in pragmas.items())
+            + f", transaction_mode={connection.transaction_mode or 'DEFERRED'}"
+        )
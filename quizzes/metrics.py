@@ -0,0 +1,183 @@
+"""
+In-process metrics for the quiz creation pipeline.
+
+Counters and histograms live in the memory of each worker process and are
+rendered in the Prometheus text exposition format by the metrics endpoint.
+Every pipeline stage is timed with ``track_stage``, which also emits one
+structured log line per stage run.
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, math.inf)
+AUDIO_SECONDS_BUCKETS = (60, 300, 600, 1200, 1800, 3600, 7200, math.inf)
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, math.inf)
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return "+Inf" if value == math.inf else repr(float(value))
+
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        """Add ``amount`` to the series identified by ``labels``."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list:
+        """Return (suffix, labels, value) tuples for rendering."""
+        with self._lock:
+            return [("", key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        """Record one observation for the series identified by ``labels``."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._series[key] = (counts, total + value)
+
+    def samples(self) -> list:
+        """Return (suffix, labels, value) tuples for rendering."""
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._series.items():
+                for bound, count in zip(self.buckets, counts):
+                    samples.append(("_bucket", key + (("le", _format_value(bound)),), count))
+                samples.append(("_sum", key, total))
+                samples.append(("_count", key, counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Holds the metrics of this process and renders them as Prometheus text."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        metric = Counter(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: tuple = DURATION_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """Register a callable returning (name, type, help, [(labels_dict, value)]) tuples at render time."""
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        for collector in self._collectors:
+            for name, type_name, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_duration = registry.histogram(
+    "quizly_pipeline_stage_duration_seconds", "Wall-clock duration of quiz pipeline stages."
+)
+stage_runs = registry.counter("quizly_pipeline_stage_runs_total", "Pipeline stage runs by outcome.")
+audio_duration = registry.histogram(
+    "quizly_audio_duration_seconds", "Duration of downloaded audio.", AUDIO_SECONDS_BUCKETS
+)
+transcript_length = registry.histogram(
+    "quizly_transcript_length_chars", "Length of transcripts passed to Gemini.", SIZE_BUCKETS
+)
+gemini_payload_size = registry.histogram(
+    "quizly_gemini_payload_bytes", "Size of prompts sent to Gemini.", SIZE_BUCKETS
+)
+transcript_sources = registry.counter(
+    "quizly_transcripts_total", "Transcripts obtained by source (whisper or captions) and cache result."
+)
+whisper_seconds_skipped = registry.counter(
+    "quizly_whisper_audio_seconds_skipped_total", "Seconds of audio not transcribed because captions were used."
+)
+invalid_questions = registry.counter(
+    "quizly_gemini_invalid_questions_total", "Invalid generated questions by outcome (fixed, repaired or dropped)."
+)
+
+
+@contextmanager
+def track_stage(stage: str, **fields):
+    """Time a pipeline stage, count its outcome and log one structured line.
+
+    Yields a dict; keys added to it inside the block are included in the log line.
+    """
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield fields
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        stage_duration.observe(duration, stage=stage)
+        stage_runs.inc(stage=stage, outcome=outcome)
+        logger.info(json.dumps({
+            "event": "pipeline_stage",
+            "stage": stage,
+            "outcome": outcome,
+            "duration_ms": round(duration * 1000, 1),
+            **fields,
+        }))
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0002_quizjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CachedTranscript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('video_id', models.CharField(max_length=32)),
+                ('model_size', models.CharField(max_length=32)),
+                ('transcript', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('video_id', 'model_size'), name='unique_transcript_per_video_model')],
+            },
+        ),
+    ]
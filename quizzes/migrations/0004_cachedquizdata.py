@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0003_cachedtranscript'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='use_quiz_cache',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.CreateModel(
+            name='CachedQuizData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transcript_hash', models.CharField(max_length=64)),
+                ('prompt_version', models.CharField(max_length=16)),
+                ('model_name', models.CharField(max_length=100)),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('transcript_hash', 'prompt_version', 'model_name'), name='unique_quiz_data_per_prompt_model')],
+            },
+        ),
+    ]
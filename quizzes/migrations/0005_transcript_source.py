@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0004_cachedquizdata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cachedtranscript',
+            name='source',
+            field=models.CharField(choices=[('whisper', 'Whisper'), ('manual_captions', 'Manual captions'), ('automatic_captions', 'Automatic captions')], default='whisper', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='transcript_source',
+            field=models.CharField(choices=[('whisper', 'Whisper'), ('manual_captions', 'Manual captions'), ('automatic_captions', 'Automatic captions')], default='whisper', max_length=20),
+        ),
+    ]
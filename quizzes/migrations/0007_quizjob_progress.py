@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0006_quizbatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizjob',
+            name='progress',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Percent done of the current stage.'),
+        ),
+    ]
@@ -1,5 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class TranscriptSource(models.TextChoices):
+    """Where the transcript behind a quiz came from."""
+
+    WHISPER = "whisper", "Whisper"
+    MANUAL_CAPTIONS = "manual_captions", "Manual captions"
+    AUTOMATIC_CAPTIONS = "automatic_captions", "Automatic captions"
 
 
 class Quiz(models.Model):
@@ -7,14 +16,22 @@ class Quiz(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, default="")
     video_url = models.URLField(max_length=500)
+    transcript_source = models.CharField(
+        max_length=20, choices=TranscriptSource.choices, default=TranscriptSource.WHISPER
+    )
     created_by = models.ForeignKey(
-        User, on_delete=models.CASCADE, related_name="quizzes"
+        User, on_delete=models.CASCADE, related_name="quizzes", db_index=False
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        # The composite indexes lead with created_by and replace the plain FK index.
+        indexes = [
+            models.Index(fields=["created_by", "-created_at", "-id"], name="quiz_owner_created_idx"),
+            models.Index(fields=["created_by", "updated_at"], name="quiz_owner_updated_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -23,7 +40,7 @@ class Quiz(models.Model):
 class Question(models.Model):
     """A multiple-choice question belonging to a Quiz."""
 
-    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="questions")
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="questions", db_index=False)
     question_title = models.TextField()
     answer = models.CharField(max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -31,6 +48,7 @@ class Question(models.Model):
 
     class Meta:
         ordering = ["id"]
+        indexes = [models.Index(fields=["quiz", "id"], name="question_quiz_id_idx")]
 
     def __str__(self):
         return self.question_title[:60]
@@ -40,9 +58,110 @@ class QuestionOption(models.Model):
     """A single answer option belonging to a Question."""
     
     question = models.ForeignKey(
-        Question, on_delete=models.CASCADE, related_name="options"
+        Question, on_delete=models.CASCADE, related_name="options", db_index=False
     )
     text = models.CharField(max_length=500)
 
+    class Meta:
+        indexes = [models.Index(fields=["question", "id"], name="option_question_id_idx")]
+
+    def __str__(self):
+        return self.text
+
+
+class QuizBatch(models.Model):
+    """A group of quiz-creation jobs submitted together, e.g. all videos of a playlist."""
+
+    created_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="quiz_batches"
+    )
+    playlist_url = models.URLField(max_length=500, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Batch {self.pk}"
+
+
+class QuizJob(models.Model):
+    """An asynchronous quiz-creation request processed by the local worker pool."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    class Stage(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        DOWNLOADING = "downloading", "Downloading"
+        TRANSCRIBING = "transcribing", "Transcribing"
+        GENERATING = "generating", "Generating"
+        SAVING = "saving", "Saving"
+        DONE = "done", "Done"
+
+    video_url = models.URLField(max_length=500)
+    created_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="quiz_jobs"
+    )
+    batch = models.ForeignKey(
+        QuizBatch, on_delete=models.CASCADE, null=True, blank=True, related_name="jobs"
+    )
+    use_quiz_cache = models.BooleanField(default=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    stage = models.CharField(max_length=20, choices=Stage.choices, default=Stage.QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent done of the current stage.")
+    quiz = models.ForeignKey(
+        Quiz, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Job {self.pk} ({self.status})"
+
+
+class CachedTranscript(models.Model):
+    """A transcript stored per YouTube video id and Whisper model size."""
+
+    video_id = models.CharField(max_length=32)
+    model_size = models.CharField(max_length=32)
+    transcript = models.TextField()
+    source = models.CharField(max_length=20, choices=TranscriptSource.choices, default=TranscriptSource.WHISPER)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["video_id", "model_size"], name="unique_transcript_per_video_model"),
+        ]
+
+    def __str__(self):
+        return f"{self.video_id} ({self.model_size})"
+
+
+class CachedQuizData(models.Model):
+    """Validated Gemini quiz output stored per transcript, prompt version and model."""
+
+    transcript_hash = models.CharField(max_length=64)
+    prompt_version = models.CharField(max_length=16)
+    model_name = models.CharField(max_length=100)
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["transcript_hash", "prompt_version", "model_name"], name="unique_quiz_data_per_prompt_model"
+            ),
+        ]
+
     def __str__(self):
-        return self.text
\ No newline at end of file
+        return f"{self.transcript_hash[:12]} ({self.prompt_version}, {self.model_name})"
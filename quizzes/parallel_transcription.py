@@ -0,0 +1,139 @@
+"""
+Chunked transcription of long audio across CPU cores.
+
+The audio is cut into overlapping segments (with ffmpeg for files, by slicing
+for already decoded samples), each segment is transcribed in a worker process
+with its own Whisper model and torch thread budget, and the texts are
+stitched back together with the overlap removed.
+This module must stay importable without Django, because worker processes
+are spawned fresh and only import what they need.
+"""
+
+import difflib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import ffmpeg
+import numpy as np
+from whisper.audio import SAMPLE_RATE
+
+from .whisper_models import WHISPER_MODEL_SIZE, model_registry
+
+logger = logging.getLogger(__name__)
+
+WHISPER_CHUNKED = os.getenv("WHISPER_CHUNKED", "False") == "True"
+WHISPER_CHUNK_SECONDS = int(os.getenv("WHISPER_CHUNK_SECONDS", "300"))
+WHISPER_CHUNK_OVERLAP_SECONDS = int(os.getenv("WHISPER_CHUNK_OVERLAP_SECONDS", "5"))
+WHISPER_CHUNK_WORKERS = int(os.getenv("WHISPER_CHUNK_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Upper bound for spoken words per second, used to size the overlap search window.
+MAX_WORDS_PER_SECOND = 4
+MIN_OVERLAP_MATCH_WORDS = 2
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def plan_segments(duration: float, segment_seconds: int, overlap_seconds: int) -> list:
+    """Return (start, length) pairs covering ``duration`` with overlapping segments."""
+    step = max(1, segment_seconds - overlap_seconds)
+    segments = []
+    start = 0.0
+    while start < duration:
+        segments.append((start, min(segment_seconds, duration - start)))
+        if start + segment_seconds >= duration:
+            break
+        start += step
+    return segments
+
+
+def _cut_segment(audio_path: str, start: float, length: float, output_path: str) -> str:
+    """Write one 16 kHz mono WAV segment of the source audio."""
+    (
+        ffmpeg.input(audio_path, ss=start, t=length)
+        .output(output_path, ac=1, ar=SAMPLE_RATE, acodec="pcm_s16le")
+        .overwrite_output()
+        .run(quiet=True)
+    )
+    return output_path
+
+
+def _init_worker(torch_threads: int) -> None:
+    """Limit torch intra-op threads so the worker processes do not oversubscribe the CPU."""
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(1)
+
+
+def _transcribe_segment(segment, model_size: str) -> str:
+    """Transcribe one segment (file path or sample array) inside a worker process."""
+    with model_registry.acquire(model_size) as model:
+        return model.transcribe(segment, fp16=False).get("text", "").strip()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Return the process pool, creating it on first use; workers keep their model loaded."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // WHISPER_CHUNK_WORKERS)
+            _pool = ProcessPoolExecutor(
+                max_workers=WHISPER_CHUNK_WORKERS,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(torch_threads,),
+            )
+        return _pool
+
+
+def _merge_pair(left: list, right: list, window: int) -> list:
+    """Join two word lists, dropping the words ``right`` repeats from the end of ``left``."""
+    tail = [w.lower().strip(".,!?;:\"'") for w in left[-window:]]
+    head = [w.lower().strip(".,!?;:\"'") for w in right[:window]]
+    match = difflib.SequenceMatcher(None, tail, head, autojunk=False).find_longest_match(
+        0, len(tail), 0, len(head)
+    )
+    if match.size < MIN_OVERLAP_MATCH_WORDS:
+        return left + right
+    cut_left = len(left) - len(tail) + match.a + match.size
+    return left[:cut_left] + right[match.b + match.size:]
+
+
+def stitch_transcripts(texts: list, overlap_seconds: int = WHISPER_CHUNK_OVERLAP_SECONDS) -> str:
+    """Concatenate segment transcripts, removing text duplicated by the overlaps."""
+    window = overlap_seconds * MAX_WORDS_PER_SECOND + MIN_OVERLAP_MATCH_WORDS
+    words = []
+    for text in texts:
+        words = _merge_pair(words, text.split(), window) if words else text.split()
+    return " ".join(words)
+
+
+def _transcribe_segments(segments: list, model_size: str, on_progress=None) -> list:
+    """Transcribe segments on the process pool, reporting the fraction of segments done in order."""
+    texts = []
+    for text in _get_pool().map(_transcribe_segment, segments, [model_size] * len(segments)):
+        texts.append(text)
+        if on_progress is not None:
+            on_progress(len(texts) / len(segments))
+    return texts
+
+
+def transcribe_in_chunks(audio, duration: float, model_size: str = WHISPER_MODEL_SIZE, on_progress=None) -> str:
+    """Transcribe long audio (file path or samples) as overlapping segments in parallel."""
+    segments = plan_segments(duration, WHISPER_CHUNK_SECONDS, WHISPER_CHUNK_OVERLAP_SECONDS)
+    logger.info("Transcribing %.0fs of audio as %d segments", duration, len(segments))
+    if isinstance(audio, np.ndarray):
+        parts = [audio[int(start * SAMPLE_RATE):int((start + length) * SAMPLE_RATE)] for start, length in segments]
+        return stitch_transcripts(_transcribe_segments(parts, model_size, on_progress))
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(audio) or None) as segment_dir:
+        paths = [
+            _cut_segment(audio, start, length, os.path.join(segment_dir, f"segment_{i:04d}.wav"))
+            for i, (start, length) in enumerate(segments)
+        ]
+        texts = _transcribe_segments(paths, model_size, on_progress)
+    return stitch_transcripts(texts)
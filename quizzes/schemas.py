@@ -0,0 +1,31 @@
+"""
+Response schemas for structured Gemini output.
+
+Passed as ``response_schema`` so Gemini returns JSON of exactly this shape;
+what a schema cannot express (the answer being one of the options) is still
+checked by the quiz validation in ``utils``.
+"""
+
+from pydantic import BaseModel, Field
+
+OPTIONS_PER_QUESTION = 4
+
+
+class QuizQuestionSchema(BaseModel):
+    question_title: str
+    question_options: list[str] = Field(min_length=OPTIONS_PER_QUESTION, max_length=OPTIONS_PER_QUESTION)
+    answer: str
+
+
+class QuizSchema(BaseModel):
+    title: str
+    description: str
+    questions: list[QuizQuestionSchema]
+
+
+class QuestionRepairSchema(BaseModel):
+    questions: list[QuizQuestionSchema]
+
+
+class FactsSchema(BaseModel):
+    facts: list[str]
@@ -0,0 +1,43 @@
+"""
+Keep ``Quiz.updated_at`` and the quiz payload cache in step with edits.
+
+The API derives ETag and Last-Modified from ``Quiz.updated_at`` and serves
+quiz payloads from the cache in caches.py. Saving a quiz updates the former
+automatically; these receivers also bump it when a question or answer option
+is saved or deleted on its own (e.g. inline in QuizAdmin), and drop the
+cached payload on every change. Rows deleted by the cascade of a quiz or
+question deletion are skipped, the receiver of that deletion covers them.
+The pipeline's bulk inserts send no signals and need none.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caches import invalidate_quiz_payloads
+from .models import Question, QuestionOption, Quiz
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def drop_quiz_payload(sender, instance, **kwargs):
+    """Invalidate the cached payload of a saved or deleted quiz."""
+    invalidate_quiz_payloads([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=Question)
+def touch_quiz_of_question(sender, instance, origin=None, **kwargs):
+    """Mark the quiz of a changed question as modified."""
+    if isinstance(origin, Quiz):
+        return
+    Quiz.objects.filter(pk=instance.quiz_id).update(updated_at=timezone.now())
+    invalidate_quiz_payloads([instance.quiz_id])
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def touch_quiz_of_option(sender, instance, origin=None, **kwargs):
+    """Mark the quiz of a changed answer option as modified."""
+    if isinstance(origin, (Quiz, Question)):
+        return
+    quiz_ids = list(Quiz.objects.filter(questions=instance.question_id).values_list("id", flat=True))
+    Quiz.objects.filter(pk__in=quiz_ids).update(updated_at=timezone.now())
+    invalidate_quiz_payloads(quiz_ids)
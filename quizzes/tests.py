@@ -0,0 +1,753 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+import httpx
+import tiktoken
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Max
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import path
+from django.utils import timezone
+from google.genai import errors
+from rest_framework.test import APIClient
+
+from users.user_cache import user_cache
+from users.utils import generate_tokens_for_user
+
+from . import gemini, jobs, metrics, tokens, utils, whisper_models
+from .api import async_views
+from .api.pagination import QuizCursorPagination
+from .api.payload_cache import QUESTION_PREFETCHES
+from .api.views import _summaries
+from .caches import quiz_payload_key
+from .models import CachedQuizData, Question, QuestionOption, Quiz, QuizJob
+from .utils import save_quiz_to_db
+
+VIDEO_URL = "https://youtu.be/dQw4w9WgXcQ"
+QUESTION = {"question_title": "Question?", "question_options": ["A", "B", "C", "D"], "answer": "A"}
+
+
+def _quiz_data(questions: int = 10) -> dict:
+    """Return quiz data as generated by Gemini with ``questions`` questions."""
+    return {"title": "Quiz", "description": "About something.", "questions": [QUESTION] * questions}
+
+
+def _client(user) -> APIClient:
+    """Return an API client authenticated as ``user``."""
+    client = APIClient()
+    client.cookies["access_token"] = generate_tokens_for_user(user)[0]
+    return client
+
+
+def _clear_caches() -> None:
+    """Empty the user and payload caches, so a request runs every query of a cold read."""
+    user_cache.clear()
+    cache.clear()
+
+
+class SaveQuizTests(TestCase):
+    """save_quiz_to_db writes a quiz with a fixed number of statements, all or nothing."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret")
+
+    def test_query_count_does_not_depend_on_question_count(self):
+        for questions in (1, 10):
+            # Savepoint, quiz, questions, options, release.
+            with self.assertNumQueries(5):
+                quiz = save_quiz_to_db(_quiz_data(questions), VIDEO_URL, self.user)
+            self.assertEqual(quiz.questions.count(), questions)
+            self.assertEqual(QuestionOption.objects.filter(question__quiz=quiz).count(), questions * 4)
+
+    def test_options_keep_their_order(self):
+        quiz = save_quiz_to_db(_quiz_data(), VIDEO_URL, self.user)
+        for question in quiz.questions.all():
+            self.assertEqual(list(question.options.order_by("id").values_list("text", flat=True)), ["A", "B", "C", "D"])
+
+    def test_failed_save_leaves_no_partial_quiz(self):
+        data = _quiz_data()
+        data["questions"] = [QUESTION, {"question_title": "No options?", "answer": "A"}]
+
+        with self.assertRaises(KeyError):
+            save_quiz_to_db(data, VIDEO_URL, self.user)
+
+        self.assertFalse(Quiz.objects.exists())
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(QuestionOption.objects.exists())
+
+
+class ReadQueryCountTests(TestCase):
+    """Quiz reads use a fixed number of queries however many quizzes and questions there are."""
+
+    def _user_with_quizzes(self, username: str, quizzes: int):
+        """Create a user owning ``quizzes`` quizzes of ten questions; return the user and the last quiz."""
+        user = User.objects.create_user(username, f"{username}@example.com", "secret")
+        for _ in range(quizzes):
+            quiz = save_quiz_to_db(_quiz_data(), VIDEO_URL, user)
+        return user, quiz
+
+    def test_list_query_count_is_constant(self):
+        for username, quizzes in (("one", 1), ("many", 8)):
+            user, _ = self._user_with_quizzes(username, quizzes)
+            client = _client(user)
+            _clear_caches()
+            # User, list validators, page, questions, options.
+            with self.assertNumQueries(5):
+                response = client.get("/api/quizzes/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), quizzes)
+            self.assertEqual(response.data["results"][0]["questions"][0]["question_options"], ["A", "B", "C", "D"])
+
+    def test_detail_query_count_is_constant(self):
+        for username, quizzes in (("one", 1), ("many", 8)):
+            user, quiz = self._user_with_quizzes(username, quizzes)
+            client = _client(user)
+            _clear_caches()
+            # User, quiz, questions, options.
+            with self.assertNumQueries(4):
+                response = client.get(f"/api/quizzes/{quiz.pk}/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["questions"]), 10)
+
+
+class ConditionalRequestTests(TestCase):
+    """ETags change with every edit of a quiz, its questions or options, so stale validators get a 200."""
+
+    def setUp(self):
+        _clear_caches()
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret")
+        self.quiz = save_quiz_to_db(_quiz_data(3), VIDEO_URL, self.user)
+        self.other = save_quiz_to_db(_quiz_data(3), VIDEO_URL, self.user)
+        self.detail_url = f"/api/quizzes/{self.quiz.pk}/"
+        self.client = _client(self.user)
+
+    def _etags(self) -> tuple:
+        """Return the current (detail, list) ETags."""
+        detail, listing = self.client.get(self.detail_url), self.client.get("/api/quizzes/")
+        self.assertEqual((detail.status_code, listing.status_code), (200, 200))
+        return detail["ETag"], listing["ETag"]
+
+    def _assert_stale(self, url: str, etag: str) -> None:
+        """Assert that ``etag`` no longer matches ``url``."""
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_unchanged_quiz_is_not_modified(self):
+        detail, listing = self._etags()
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=detail).status_code, 304)
+        self.assertEqual(self.client.get("/api/quizzes/", HTTP_IF_NONE_MATCH=listing).status_code, 304)
+
+    def test_patch_changes_the_etags(self):
+        detail, listing = self._etags()
+
+        response = self.client.patch(self.detail_url, {"title": "Changed"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], detail)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        self._assert_stale(self.detail_url, detail)
+        self._assert_stale("/api/quizzes/", listing)
+
+    def test_delete_changes_the_list_etag(self):
+        listing = self._etags()[1]
+
+        self.assertEqual(self.client.delete(f"/api/quizzes/{self.other.pk}/").status_code, 204)
+
+        self._assert_stale("/api/quizzes/", listing)
+
+    def test_question_and_option_edits_change_the_etags(self):
+        question = self.quiz.questions.order_by("id").first()
+        option = question.options.order_by("id").first()
+        edits = {
+            "question saved": lambda: Question.objects.get(pk=question.pk).save(),
+            "option saved": lambda: QuestionOption.objects.get(pk=option.pk).save(),
+            "option deleted": lambda: QuestionOption.objects.get(pk=option.pk).delete(),
+            "question deleted": lambda: Question.objects.get(pk=question.pk).delete(),
+        }
+        for name, edit in edits.items():
+            with self.subTest(name):
+                detail, listing = self._etags()
+                edit()
+                self._assert_stale(self.detail_url, detail)
+                self._assert_stale("/api/quizzes/", listing)
+
+
+class PayloadCacheTests(TestCase):
+    """Cached quiz payloads follow edits and deletes, and their lookups show up in the metrics."""
+
+    def setUp(self):
+        _clear_caches()
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret", is_staff=True)
+        self.quiz = save_quiz_to_db(_quiz_data(3), VIDEO_URL, self.user)
+        self.detail_url = f"/api/quizzes/{self.quiz.pk}/"
+        self.client = _client(self.user)
+        self.question = self.quiz.questions.order_by("id").first()
+        self.option = self.question.options.order_by("id").first()
+
+    def _payloads(self) -> tuple:
+        """Return the (detail, list entry) payloads of the quiz."""
+        detail = self.client.get(self.detail_url).json()
+        listing = {quiz["id"]: quiz for quiz in self.client.get("/api/quizzes/").json()["results"]}
+        return detail, listing[self.quiz.pk]
+
+    def _payload_lookups(self) -> dict:
+        """Return the payload cache's {result: count} as rendered by the metrics endpoint."""
+        lines = self.client.get("/api/metrics/").content.decode().splitlines()
+        prefix = 'quizly_cache_lookups_total{cache="payload",result="'
+        return {
+            line[len(prefix):].split('"')[0]: float(line.rsplit(" ", 1)[1])
+            for line in lines if line.startswith(prefix)
+        }
+
+    def test_question_and_option_edits_are_served(self):
+        self._payloads()
+        question = Question.objects.get(pk=self.question.pk)
+        question.question_title = "Edited?"
+        question.save()
+        option = QuestionOption.objects.get(pk=self.option.pk)
+        option.text = "Edited"
+        option.save()
+
+        for payload in self._payloads():
+            first = next(q for q in payload["questions"] if q["id"] == self.question.pk)
+            self.assertEqual(first["question_title"], "Edited?")
+            self.assertIn("Edited", first["question_options"])
+
+    def test_deleted_option_is_not_served(self):
+        self._payloads()
+
+        QuestionOption.objects.get(pk=self.option.pk).delete()
+
+        for payload in self._payloads():
+            first = next(q for q in payload["questions"] if q["id"] == self.question.pk)
+            self.assertEqual(len(first["question_options"]), len(QUESTION["question_options"]) - 1)
+
+    def test_deleted_quiz_is_dropped(self):
+        self._payloads()
+        self.assertIsNotNone(cache.get(quiz_payload_key(self.quiz.pk)))
+
+        self.assertEqual(self.client.delete(self.detail_url).status_code, 204)
+
+        self.assertIsNone(cache.get(quiz_payload_key(self.quiz.pk)))
+        self.assertEqual(self.client.get(self.detail_url).status_code, 404)
+        self.assertEqual(self.client.get("/api/quizzes/").json()["results"], [])
+
+    def test_cascade_delete_does_not_raise(self):
+        self._payloads()
+        other = User.objects.create_user("bob", "bob@example.com", "secret")
+        other_quiz = save_quiz_to_db(_quiz_data(3), VIDEO_URL, other)
+
+        Question.objects.get(pk=self.question.pk).delete()
+        other.delete()
+
+        self.assertFalse(Quiz.objects.filter(pk=other_quiz.pk).exists())
+        detail, entry = self._payloads()
+        self.assertEqual(len(detail["questions"]), 2)
+        self.assertEqual(len(entry["questions"]), 2)
+
+    def test_lookups_are_counted_in_the_metrics(self):
+        before = self._payload_lookups()
+
+        self.client.get(self.detail_url)
+        self.client.get(self.detail_url)
+
+        after = self._payload_lookups()
+        self.assertEqual(after["miss"] - before["miss"], 1)
+        self.assertEqual(after["hit"] - before["hit"], 1)
+
+
+class PaginationTests(TestCase):
+    """Following next and previous links visits every quiz once, in order, also across equal created_at."""
+
+    def setUp(self):
+        _clear_caches()
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret")
+        self.client = _client(self.user)
+        quizzes = [save_quiz_to_db(_quiz_data(1), VIDEO_URL, self.user) for _ in range(7)]
+        # Quizzes 2-5 share one timestamp, so a page boundary falls inside the tie.
+        Quiz.objects.filter(pk__in=[quiz.pk for quiz in quizzes[1:5]]).update(created_at=quizzes[1].created_at)
+        self.expected = list(
+            Quiz.objects.order_by(*QuizCursorPagination.ordering).values_list("id", flat=True)
+        )
+
+    def _walk(self, url: str, link: str) -> tuple:
+        """Follow ``link`` ("next" or "previous") from ``url``; return (page id lists, last page body)."""
+        pages = []
+        while url:
+            body = self.client.get(url).json()
+            pages.append([quiz["id"] for quiz in body["results"]])
+            url = body[link]
+        return pages, body
+
+    def test_next_and_previous_walk_every_page(self):
+        for fields in ("", "&fields=summary"):
+            with self.subTest(fields=fields or "full"):
+                forward, last = self._walk(f"/api/quizzes/?page_size=2{fields}", "next")
+                self.assertEqual([len(page) for page in forward], [2, 2, 2, 1])
+                self.assertEqual(sum(forward, []), self.expected)
+
+                backward, first = self._walk(last["previous"], "previous")
+                self.assertEqual(backward, forward[-2::-1])
+                self.assertIsNone(first["previous"])
+
+
+# Routes the quiz endpoints to the async views for AsyncConditionalRequestTests.
+urlpatterns = [
+    path("api/quizzes/", async_views.AsyncQuizListCreateView.as_view()),
+    path("api/quizzes/<int:pk>/", async_views.AsyncQuizDetailView.as_view()),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncConditionalRequestTests(ConditionalRequestTests):
+    """The same validator checks against the async views."""
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncPaginationTests(PaginationTests):
+    """The same page walk against the async views."""
+
+
+# Closing the connection inside a TestCase would break its transaction.
+@mock.patch.object(jobs, "connections")
+class JobTests(TestCase):
+    """Pipeline steps only run unfinished jobs and record failures; jobs no live process refreshes are failed."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret")
+        self.addCleanup(jobs._queued_jobs.clear)
+
+    def test_deleted_job_is_skipped(self, _):
+        job = QuizJob.objects.create(video_url=VIDEO_URL, created_by=self.user)
+        job_id = job.pk
+        job.delete()
+        with mock.patch.object(jobs, "create_quiz_from_youtube") as create, self.assertLogs(jobs.logger, "INFO"):
+            jobs.run_quiz_job(job_id)
+        create.assert_not_called()
+
+    def test_failed_job_is_not_resurrected(self, _):
+        job = QuizJob.objects.create(video_url=VIDEO_URL, created_by=self.user, status=QuizJob.Status.FAILED)
+        with mock.patch.object(jobs, "create_quiz_from_youtube") as create, self.assertLogs(jobs.logger, "INFO"):
+            jobs.run_quiz_job(job.pk)
+        create.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.status, QuizJob.Status.FAILED)
+
+    def test_failed_step_marks_the_job_failed(self, _):
+        job = QuizJob.objects.create(video_url=VIDEO_URL, created_by=self.user)
+        with mock.patch.object(jobs, "create_quiz_from_youtube", side_effect=ValueError("No audio found.")):
+            jobs.run_quiz_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (QuizJob.Status.FAILED, "No audio found."))
+
+    def test_stale_unfinished_jobs_are_failed(self, _):
+        old = timezone.now() - timedelta(hours=2)
+        pending, running, succeeded, fresh = (
+            QuizJob.objects.create(video_url=VIDEO_URL, created_by=self.user, status=status)
+            for status in ["pending", "running", "succeeded", "running"]
+        )
+        QuizJob.objects.exclude(pk=fresh.pk).update(updated_at=old)
+
+        self.assertEqual(jobs.fail_stale_jobs(3600), 2)
+
+        statuses = dict(QuizJob.objects.values_list("pk", "status"))
+        self.assertEqual(
+            [statuses[job.pk] for job in (pending, running, succeeded, fresh)],
+            [QuizJob.Status.FAILED, QuizJob.Status.FAILED, QuizJob.Status.SUCCEEDED, QuizJob.Status.RUNNING],
+        )
+
+    def test_jobs_queued_in_a_live_process_are_not_failed(self, _):
+        queued, orphaned = (QuizJob.objects.create(video_url=VIDEO_URL, created_by=self.user) for _ in range(2))
+        QuizJob.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+        jobs._track_jobs([queued.pk])
+
+        self.assertEqual(jobs.touch_queued_jobs(), 1)
+        self.assertEqual(jobs.fail_stale_jobs(3600), 1)
+
+        statuses = dict(QuizJob.objects.values_list("pk", "status"))
+        self.assertEqual([statuses[queued.pk], statuses[orphaned.pk]], [QuizJob.Status.PENDING, QuizJob.Status.FAILED])
+
+    def test_heartbeat_forgets_finished_jobs(self, _):
+        job = QuizJob.objects.create(video_url=VIDEO_URL, created_by=self.user, status=QuizJob.Status.SUCCEEDED)
+        jobs._track_jobs([job.pk])
+
+        self.assertEqual(jobs.touch_queued_jobs(), 0)
+        self.assertEqual(jobs._queued_jobs, set())
+
+
+class JobEventsTests(TestCase):
+    """The progress stream of a job always ends."""
+
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret")
+        self.job = QuizJob.objects.create(video_url=VIDEO_URL, created_by=self.user, status=QuizJob.Status.RUNNING)
+        self.url = f"/api/quizzes/jobs/{self.job.pk}/events/"
+        self.access_token = generate_tokens_for_user(self.user)[0]
+
+    async def _events(self) -> list:
+        """Collect every event of the job's stream."""
+        return [event async for event in async_views._job_events(self.job.pk)]
+
+    async def test_stale_job_ends_as_failed(self):
+        await QuizJob.objects.filter(pk=self.job.pk).aupdate(updated_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(
+            await self._events(),
+            [async_views._sse("done", {"status": "failed", "quiz": None, "error": jobs.STALE_JOB_ERROR})],
+        )
+
+    async def test_stream_closes_after_the_maximum_duration(self):
+        with mock.patch.object(async_views, "JOB_EVENTS_MAX_SECONDS", 0):
+            self.assertEqual(await self._events(), [])
+
+    def test_wsgi_streams_from_a_blocking_generator(self):
+        response = _client(self.user).get(self.url)
+        self.assertFalse(response.is_async)
+        progress = next(response.streaming_content)
+        self.assertIn(b"event: progress", progress)
+
+        QuizJob.objects.filter(pk=self.job.pk).update(status=QuizJob.Status.SUCCEEDED)
+        with mock.patch.object(async_views, "JOB_EVENTS_POLL_SECONDS", 0):
+            self.assertIn(b"event: done", b"".join(response.streaming_content))
+
+    async def test_asgi_streams_from_an_async_generator(self):
+        await QuizJob.objects.filter(pk=self.job.pk).aupdate(status=QuizJob.Status.SUCCEEDED)
+        client = AsyncClient()
+        client.cookies["access_token"] = self.access_token
+        response = await client.get(self.url)
+        self.assertTrue(response.is_async)
+        self.assertIn(b"event: done", b"".join([chunk async for chunk in response.streaming_content]))
+
+
+def _count(counter, **labels) -> float:
+    """Return the current value of one series of a metrics counter."""
+    values = {key: value for _, key, value in counter.samples()}
+    return values.get(tuple(sorted(labels.items())), 0)
+
+
+class _FakeClock:
+    """Monotonic clock for tenacity that only advances when the test says so."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class _StubModels:
+    """Stand-in for ``genai.Client.models``: raises the queued errors, then ``always`` or answers."""
+
+    def __init__(self, failures=(), always=None, clock=None, seconds_per_call: float = 0.0):
+        self.failures = list(failures)
+        self.always = always
+        self.clock = clock
+        self.seconds_per_call = seconds_per_call
+        self.started_at = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.started_at)
+
+    def generate_content(self, **kwargs):
+        self.started_at.append(self.clock.now if self.clock else 0.0)
+        if self.clock:
+            self.clock.now += self.seconds_per_call
+        if self.failures:
+            raise self.failures.pop(0)
+        if self.always is not None:
+            raise self.always
+        return SimpleNamespace(text='{"ok": true}')
+
+
+def _server_error(code: int = 503) -> errors.ServerError:
+    return errors.ServerError(code, {"error": {"code": code, "message": "Unavailable", "status": "UNAVAILABLE"}})
+
+
+def _client_error(code: int) -> errors.ClientError:
+    return errors.ClientError(code, {"error": {"code": code, "message": "Rejected", "status": "REJECTED"}})
+
+
+class GeminiRetryTests(SimpleTestCase):
+    """generate_content retries transient failures with backoff, within attempt and time limits."""
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        for patcher in (
+            mock.patch("tenacity.time", self.clock),
+            mock.patch.object(gemini.generate_content.retry, "sleep", self.clock.sleep),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _generate(self, models: _StubModels) -> str:
+        with mock.patch.object(gemini, "get_client", return_value=SimpleNamespace(models=models)):
+            return gemini.generate_content("prompt", None)
+
+    def test_transient_failures_are_retried(self):
+        retried_429 = _count(gemini.retries, reason="429")
+        retried_503 = _count(gemini.retries, reason="503")
+        retried_transport = _count(gemini.retries, reason="ConnectError")
+        throttled = _count(gemini.throttled, source="api")
+        models = _StubModels([_client_error(429), _server_error(503), httpx.ConnectError("refused")])
+
+        with self.assertLogs(gemini.logger, "WARNING") as logs:
+            self.assertEqual(self._generate(models), '{"ok": true}')
+
+        self.assertEqual(models.calls, 4)
+        self.assertEqual(len(logs.records), 3)
+        self.assertEqual(_count(gemini.retries, reason="429"), retried_429 + 1)
+        self.assertEqual(_count(gemini.retries, reason="503"), retried_503 + 1)
+        self.assertEqual(_count(gemini.retries, reason="ConnectError"), retried_transport + 1)
+        self.assertEqual(_count(gemini.throttled, source="api"), throttled + 1)
+        self.assertGreater(self.clock.now, 0)
+
+    def test_gives_up_after_the_attempt_limit(self):
+        models = _StubModels(always=_server_error())
+
+        with self.assertRaises(errors.ServerError), self.assertLogs(gemini.logger, "WARNING"):
+            self._generate(models)
+
+        self.assertEqual(models.calls, gemini.GEMINI_RETRY_ATTEMPTS)
+
+    def test_client_errors_are_not_retried(self):
+        retried = _count(gemini.retries, reason="400")
+        models = _StubModels(always=_client_error(400))
+
+        with self.assertRaises(errors.ClientError):
+            self._generate(models)
+
+        self.assertEqual(models.calls, 1)
+        self.assertEqual(_count(gemini.retries, reason="400"), retried)
+
+    def test_stops_retrying_at_the_deadline(self):
+        seconds_per_call = gemini.GEMINI_RETRY_DEADLINE_SECONDS * 0.4
+        models = _StubModels(always=_server_error(), clock=self.clock, seconds_per_call=seconds_per_call)
+
+        with self.assertRaises(errors.ServerError), self.assertLogs(gemini.logger, "WARNING"):
+            self._generate(models)
+
+        self.assertLess(models.calls, gemini.GEMINI_RETRY_ATTEMPTS)
+        self.assertTrue(all(started < gemini.GEMINI_RETRY_DEADLINE_SECONDS for started in models.started_at))
+        self.assertGreaterEqual(self.clock.now, gemini.GEMINI_RETRY_DEADLINE_SECONDS)
+
+
+INVALID_QUESTION = {**QUESTION, "answer": "E"}
+
+
+class QuizRepairTests(TestCase):
+    """Invalid generated questions are re-requested once, and dropped if Gemini cannot repair them."""
+
+    def _check(self, questions: list, *responses: list) -> tuple:
+        """Check quiz data with Gemini answering the repair prompts with ``responses``.
+
+        Returns the kept questions and the increase of every invalid-question outcome.
+        """
+        outcomes = ("fixed", "repaired", "dropped")
+        counter = metrics.invalid_questions
+        before = {outcome: _count(counter, outcome=outcome) for outcome in outcomes}
+        raw = [json.dumps({"questions": response}) for response in responses]
+        with mock.patch.object(utils, "_call_gemini", side_effect=raw) as call:
+            data = utils._check_quiz_data({"title": "Quiz", "description": "About something.", "questions": questions})
+        self.assertEqual(call.call_count, len(responses))
+        counted = {outcome: _count(counter, outcome=outcome) - before[outcome] for outcome in outcomes}
+        return data["questions"], counted
+
+    def test_answer_differing_in_case_is_fixed_once(self):
+        questions, counted = self._check([QUESTION] * 4 + [{**QUESTION, "answer": " a "}])
+
+        self.assertEqual(questions, [QUESTION] * 5)
+        self.assertEqual(counted, {"fixed": 1, "repaired": 0, "dropped": 0})
+
+    def test_invalid_question_is_repaired(self):
+        replacement = {**QUESTION, "question_title": "Replacement?", "answer": "b "}
+
+        with self.assertLogs("quizzes", "INFO"):
+            questions, counted = self._check([QUESTION] * 5 + [INVALID_QUESTION], [replacement])
+
+        self.assertEqual(questions[5], {**replacement, "answer": "B"})
+        self.assertEqual(counted, {"fixed": 0, "repaired": 1, "dropped": 0})
+
+    def test_partial_repair_drops_the_rest(self):
+        with self.assertLogs("quizzes", "INFO"):
+            questions, counted = self._check([QUESTION] * 5 + [INVALID_QUESTION] * 2, [QUESTION, INVALID_QUESTION])
+
+        self.assertEqual(questions, [QUESTION] * 6)
+        self.assertEqual(counted, {"fixed": 0, "repaired": 1, "dropped": 1})
+
+    def test_questions_without_replacement_are_dropped(self):
+        with mock.patch.object(utils, "GEMINI_REPAIR_ATTEMPTS", 2), self.assertLogs("quizzes", "INFO") as logs:
+            questions, counted = self._check([QUESTION] * 5 + [INVALID_QUESTION] * 2, [QUESTION])
+
+        self.assertEqual(questions, [QUESTION] * 6)
+        self.assertEqual(counted, {"fixed": 0, "repaired": 1, "dropped": 1})
+        self.assertTrue(any("returned 1 questions for 2 requested" in line for line in logs.output))
+
+    def test_too_few_valid_questions_fail(self):
+        with self.assertLogs("quizzes", "INFO"), self.assertRaises(ValueError):
+            self._check([QUESTION] * 4 + [INVALID_QUESTION], [INVALID_QUESTION])
+
+    def test_fresh_quiz_data_is_not_cached(self):
+        with mock.patch.object(utils, "_request_quiz_data", side_effect=lambda _: _quiz_data(5)) as request:
+            utils.generate_quiz_data("transcript", use_cache=False)
+            self.assertFalse(CachedQuizData.objects.exists())
+            utils.generate_quiz_data("transcript")
+            with self.assertLogs(utils.logger, "INFO"):
+                utils.generate_quiz_data("transcript")
+
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(CachedQuizData.objects.count(), 1)
+
+
+def _byte_encoding() -> tiktoken.Encoding:
+    """Return a tiktoken encoding with one token per byte, so every multibyte character spans tokens."""
+    return tiktoken.Encoding(
+        name="bytes", pat_str=r"\s?\S+|\s+", mergeable_ranks={bytes([b]): b for b in range(256)}, special_tokens={}
+    )
+
+
+class SplitByTokensTests(SimpleTestCase):
+    """Transcript chunks end at whole characters and, where possible, at sentence or word ends."""
+
+    TEXT = "Grüße aus Köln. Später geht es nach Zürich, dann weiter nach 東京 und Kyōto! Ende."
+
+    def _split(self, encoding, max_tokens: int) -> list:
+        with mock.patch.object(tokens, "_encoding", return_value=encoding):
+            return tokens.split_by_tokens(self.TEXT, max_tokens)
+
+    def test_multibyte_characters_are_not_split(self):
+        encoding = _byte_encoding()
+        for max_tokens in range(4, 40):
+            with self.subTest(max_tokens=max_tokens):
+                chunks = self._split(encoding, max_tokens)
+                self.assertEqual("".join(chunks), self.TEXT)
+                self.assertNotIn("\ufffd", "".join(chunks))
+                self.assertTrue(all(len(chunk.encode()) <= max_tokens for chunk in chunks))
+
+    def test_chunks_end_at_sentences_then_words(self):
+        chunks = self._split(_byte_encoding(), 32)
+
+        self.assertEqual(chunks[0], "Grüße aus Köln.")
+        self.assertTrue(all(chunk.startswith(" ") for chunk in chunks[1:]))
+
+    def test_estimate_splits_at_words(self):
+        chunks = self._split(None, 5)
+
+        self.assertEqual("".join(chunks), self.TEXT)
+        self.assertTrue(all(len(chunk) <= 5 * tokens.CHARS_PER_TOKEN for chunk in chunks))
+        self.assertTrue(all(chunk.startswith(" ") for chunk in chunks[1:]))
+
+
+class GeminiConcurrencyTests(SimpleTestCase):
+    """At most GEMINI_MAX_CONCURRENCY requests are in flight; the rest wait and are counted."""
+
+    def test_requests_beyond_the_limit_wait(self):
+        limit = gemini.GEMINI_MAX_CONCURRENCY
+        throttled = _count(gemini.throttled, source="local")
+        release = threading.Event()
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def generate_content(**kwargs):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            release.wait(5)
+            with lock:
+                state["in_flight"] -= 1
+            return SimpleNamespace(text="{}")
+
+        client = SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+        with mock.patch.object(gemini, "get_client", return_value=client):
+            threads = [
+                threading.Thread(target=gemini.generate_content, args=("prompt", None)) for _ in range(2 * limit)
+            ]
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 5
+            while _count(gemini.throttled, source="local") < throttled + limit and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(state["in_flight"], limit)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(state["peak"], limit)
+        self.assertEqual(_count(gemini.throttled, source="local"), throttled + limit)
+
+
+class TranscriptionProgressTests(SimpleTestCase):
+    """Whisper's tqdm bar is replaced only while a thread reports progress."""
+
+    def test_progress_is_reported_and_tqdm_restored(self):
+        module = whisper_models._transcribe_module()
+        original, fractions = module.tqdm, []
+        with whisper_models.transcription_progress(fractions.append):
+            with module.tqdm.tqdm(total=4) as bar:
+                bar.update(1)
+                bar.update(3)
+        self.assertEqual(fractions, [0.25, 1.0])
+        self.assertIs(module.tqdm, original)
+
+
+# Any plan step starting with one of these is an index regression.
+FORBIDDEN_PLAN_STEPS = ("SCAN ", "USE TEMP B-TREE")
+
+
+def _page(queryset) -> list:
+    """Evaluate the first cursor page of ``queryset``."""
+    return list(queryset.order_by(*QuizCursorPagination.ordering)[:QuizCursorPagination.page_size + 1])
+
+
+@skipUnless(connection.vendor == "sqlite", "Query plans are checked with SQLite's EXPLAIN QUERY PLAN.")
+class QueryPlanTests(TestCase):
+    """The hot list, prefetch and registration queries search indexes instead of scanning or sorting."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", "alice@example.com", "secret")
+        cls.quiz_ids = [save_quiz_to_db(_quiz_data(3), VIDEO_URL, cls.user).pk for _ in range(3)]
+        cls.question_ids = list(Question.objects.values_list("id", flat=True)[:3])
+
+    def _checks(self) -> dict:
+        """Return the hot queries by name, each built the way the API builds it."""
+        quizzes = Quiz.objects.filter(created_by=self.user)
+        return {
+            "quiz list page": lambda: _page(quizzes),
+            "quiz list page after cursor": lambda: _page(quizzes.filter(created_at__lt=timezone.now())),
+            "quiz summary page": lambda: _page(_summaries(quizzes)),
+            "quiz list validators": lambda: quizzes.aggregate(count=Count("id"), last_updated=Max("updated_at")),
+            "questions prefetch": lambda: list(QUESTION_PREFETCHES[0].queryset.filter(quiz__in=self.quiz_ids)),
+            "options prefetch": lambda: list(QUESTION_PREFETCHES[1].queryset.filter(question__in=self.question_ids)),
+            "register email lookup": lambda: User.objects.filter(email="someone@example.com").exists(),
+        }
+
+    def _query_plans(self, run) -> list:
+        """Run ``run`` and return the plan steps of every query it executed."""
+        with CaptureQueriesContext(connection) as captured:
+            run()
+        plans = []
+        with connection.cursor() as cursor:
+            for query in captured.captured_queries:
+                cursor.execute("EXPLAIN QUERY PLAN " + query["sql"])
+                plans.append([row[-1] for row in cursor.fetchall()])
+        return plans
+
+    def test_hot_queries_use_indexes_without_sorting(self):
+        for name, run in self._checks().items():
+            with self.subTest(name):
+                plans = self._query_plans(run)
+                self.assertTrue(plans)
+                for plan in plans:
+                    bad = [step for step in plan if step.startswith(FORBIDDEN_PLAN_STEPS)]
+                    self.assertFalse(bad, "\n".join(plan))
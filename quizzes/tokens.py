@@ -0,0 +1,91 @@
+"""
+Token counting and chunking for Gemini prompts.
+
+Gemini does not ship a local tokenizer, so tiktoken's cl100k_base encoding is
+used as an estimate. If the encoding cannot be loaded (it is downloaded on
+first use), a four-characters-per-token heuristic is used instead.
+"""
+
+import functools
+import logging
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+SENTENCE_ENDS = ".!?…。！？"
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    """Return the tiktoken encoding, or None if it is unavailable."""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as exc:
+        logger.warning("tiktoken encoding unavailable, estimating tokens from length: %s", exc)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Return the (estimated) number of tokens in ``text``."""
+    encoding = _encoding()
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _chunk_end(text: str, offsets: list, start: int, size: int) -> int:
+    """Return the index in ``offsets`` to end the chunk starting at index ``start``.
+
+    In the second half of the window, the latest offset right after a sentence
+    end wins, then the latest one in front of whitespace, then the latest one
+    at all. ``None`` offsets (tokens starting inside a character) are skipped.
+    """
+    last = start + size
+    word_end = any_end = None
+    for i in range(last, start, -1):
+        offset = offsets[i]
+        if offset is None:
+            continue
+        if i > start + size // 2 and text[offset].isspace():
+            if text[offset - 1] in SENTENCE_ENDS:
+                return i
+            word_end = word_end or i
+        any_end = any_end or i
+    if word_end or any_end:
+        return word_end or any_end
+    # The whole window lies inside one character: end after it.
+    return next(i for i in range(last + 1, len(offsets)) if offsets[i] is not None)
+
+
+def _split_at_offsets(text: str, offsets: list, size: int) -> list:
+    """Split ``text`` at character ``offsets`` into chunks spanning at most ``size`` of them.
+
+    ``offsets`` ascends from 0 and ends with ``len(text)``; ``None`` marks an
+    index no chunk may end at.
+    """
+    chunks, start, end_of_text = [], 0, len(offsets) - 1
+    while start < end_of_text:
+        end = end_of_text if start + size >= end_of_text else _chunk_end(text, offsets, start, size)
+        chunks.append(text[offsets[start]:offsets[end]])
+        start = end
+    return chunks
+
+
+def split_by_tokens(text: str, max_tokens: int) -> list:
+    """Split ``text`` into consecutive chunks of at most ``max_tokens`` (estimated) tokens.
+
+    Chunks end at sentence or word boundaries where possible and never inside
+    a multibyte character. Joined, the chunks give back ``text``.
+    """
+    encoding = _encoding()
+    if encoding is None:
+        return _split_at_offsets(text, list(range(len(text) + 1)), max_tokens * CHARS_PER_TOKEN)
+    tokens = encoding.encode(text, disallowed_special=())
+    offsets = encoding.decode_with_offsets(tokens)[1] + [len(text)]
+    # A token whose first byte continues a UTF-8 character cannot start a chunk.
+    for i, token_bytes in enumerate(encoding.decode_tokens_bytes(tokens)):
+        if token_bytes and 0x80 <= token_bytes[0] < 0xC0:
+            offsets[i] = None
+    return _split_at_offsets(text, offsets, max_tokens)
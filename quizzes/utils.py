@@ -1,28 +1,42 @@
 """
 Helper functions for the quiz creation pipeline:
-  1. Download audio from YouTube (yt-dlp)
-  2. Transcribe audio (Whisper)
-  3. Generate quiz data (Gemini)
-  4. Save quiz to database
+  1. Obtain a transcript: cache, YouTube captions, or download audio (yt-dlp)
+     and transcribe it (Whisper)
+  2. Generate quiz data (Gemini)
+  3. Save quiz to database
 """
 
+import hashlib
 import json
 import logging
 import os
 import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
 
-from google import genai
 from google.genai import types
-import whisper
 import yt_dlp
+from django.db import transaction
 
-from .models import Quiz, Question, QuestionOption
+from . import metrics
+from .audio import WHISPER_AUDIO_MODE, load_pcm, probe_duration
+from .caches import get_cached_quiz_data, get_cached_transcript, store_quiz_data, store_transcript
+from .captions import CAPTIONS_ENABLED, fetch_caption_transcript
+from .gemini import GEMINI_API_KEY, GEMINI_MODEL, generate_content
+from .models import Quiz, QuizJob, Question, QuestionOption, TranscriptSource
+from .parallel_transcription import WHISPER_CHUNK_SECONDS, WHISPER_CHUNKED, transcribe_in_chunks
+from .schemas import OPTIONS_PER_QUESTION, FactsSchema, QuestionRepairSchema, QuizSchema
+from .tokens import count_tokens, split_by_tokens
+from .whisper_models import WHISPER_MODEL_SIZE, model_registry, transcription_progress
 
 logger = logging.getLogger(__name__)
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL", "base")
+GEMINI_TOKEN_BUDGET = int(os.getenv("GEMINI_TOKEN_BUDGET", "100000"))
+GEMINI_CHUNK_TOKENS = int(os.getenv("GEMINI_CHUNK_TOKENS", "30000"))
+GEMINI_MAP_WORKERS = int(os.getenv("GEMINI_MAP_WORKERS", "4"))
+GEMINI_REPAIR_ATTEMPTS = int(os.getenv("GEMINI_REPAIR_ATTEMPTS", "1"))
+QUIZ_MIN_QUESTIONS = int(os.getenv("QUIZ_MIN_QUESTIONS", "5"))
 
 GEMINI_PROMPT_TEMPLATE = """
 You are a quiz creation assistant.
@@ -48,24 +62,160 @@ Transcript:
 \"\"\"
 """
 
+GEMINI_FACTS_PROMPT_TEMPLATE = """
+You are helping to create a quiz from a long video transcript.
+Below is one part of that transcript. List the key facts, definitions, names,
+numbers and explanations from this part that would make good quiz questions.
+Each fact must be a single self-contained sentence.
+Return ONLY valid JSON in this exact structure:
+{{
+  "facts": ["<fact>", "<fact>"]
+}}
+Transcript part {index} of {total}:
+\"\"\"
+{transcript}
+\"\"\"
+"""
+
+GEMINI_FACTS_QUIZ_PROMPT_TEMPLATE = """
+You are a quiz creation assistant.
+Based on the following key facts extracted from a video transcript, create exactly 10 multiple-choice questions.
+Cover facts from the whole list, not only from its beginning.
+Each question must have exactly 4 answer options, with exactly 1 correct answer.
+Also generate a concise quiz title (max 80 chars) and a short description (max 200 chars).
+Return ONLY valid JSON in this exact structure:
+{{
+  "title": "<quiz title>",
+  "description": "<quiz description>",
+  "questions": [
+    {{
+      "question_title": "<question text>",
+      "question_options": ["Option A", "Option B", "Option C", "Option D"],
+      "answer": "Option A"
+    }}
+  ]
+}}
+The "answer" field must be the exact text of the correct option from "question_options".
+Key facts:
+\"\"\"
+{facts}
+\"\"\"
+"""
 
-def _build_ydl_opts(output_dir: str) -> dict:
-    """Return yt-dlp options for mp3 audio extraction."""
-    return {
+GEMINI_REPAIR_PROMPT_TEMPLATE = """
+You are a quiz creation assistant.
+The following {count} multiple-choice questions from a quiz are invalid; each one comes with the problem found.
+Fix every question so that it has exactly 4 distinct answer options and exactly 1 correct answer.
+Keep the topic and wording of each question where possible.
+The "answer" field must be the exact text of the correct option from "question_options".
+Return the fixed questions in the same order as a JSON object with a "questions" list.
+Invalid questions:
+\"\"\"
+{questions}
+\"\"\"
+"""
+
+# Changes whenever a template or the response schema changes, which invalidates cached quiz data.
+GEMINI_PROMPT_VERSION = hashlib.sha256(
+    (
+        GEMINI_PROMPT_TEMPLATE
+        + GEMINI_FACTS_PROMPT_TEMPLATE
+        + GEMINI_FACTS_QUIZ_PROMPT_TEMPLATE
+        + GEMINI_REPAIR_PROMPT_TEMPLATE
+        + json.dumps(QuizSchema.model_json_schema(), sort_keys=True)
+    ).encode()
+).hexdigest()[:16]
+
+
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+YOUTUBE_PATH_PREFIXES = ("/shorts/", "/embed/", "/live/", "/v/")
+PLAYLIST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{10,64}$")
+
+
+def extract_video_id(youtube_url: str):
+    """Return the canonical 11-character video id of a YouTube URL, or None."""
+    parsed = urlparse(youtube_url)
+    host = (parsed.hostname or "").lower()
+    if host == "youtu.be":
+        candidate = parsed.path.lstrip("/").split("/")[0]
+    elif host == "youtube.com" or host.endswith(".youtube.com"):
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [""])[0]
+        else:
+            prefix = next((p for p in YOUTUBE_PATH_PREFIXES if parsed.path.startswith(p)), None)
+            candidate = parsed.path[len(prefix):].split("/")[0] if prefix else ""
+    else:
+        return None
+    return candidate if VIDEO_ID_PATTERN.match(candidate) else None
+
+
+def extract_playlist_id(youtube_url: str):
+    """Return the playlist id of a YouTube URL with a ``list`` parameter, or None."""
+    parsed = urlparse(youtube_url)
+    host = (parsed.hostname or "").lower()
+    if host != "youtube.com" and not host.endswith(".youtube.com"):
+        return None
+    candidate = parse_qs(parsed.query).get("list", [""])[0]
+    return candidate if PLAYLIST_ID_PATTERN.match(candidate) else None
+
+
+def expand_playlist(playlist_url: str, limit: int) -> list:
+    """Return the watch URLs of the first ``limit`` videos of a YouTube playlist."""
+    playlist_id = extract_playlist_id(playlist_url)
+    opts = {"extract_flat": "in_playlist", "playlistend": limit, "quiet": True, "no_warnings": True}
+    try:
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            info = ydl.extract_info(f"https://www.youtube.com/playlist?list={playlist_id}", download=False)
+    except Exception as exc:
+        logger.error("Playlist lookup failed for %s: %s", playlist_url, exc)
+        raise ValueError(f"Could not read playlist: {exc}") from exc
+    video_ids = [entry.get("id") or "" for entry in info.get("entries") or [] if entry]
+    urls = [f"https://www.youtube.com/watch?v={video_id}" for video_id in video_ids if VIDEO_ID_PATTERN.match(video_id)]
+    if not urls:
+        raise ValueError("The playlist contains no videos.")
+    return urls[:limit]
+
+
+def _download_progress_hook(on_progress):
+    """Return a yt-dlp progress hook that reports the downloaded fraction to ``on_progress``."""
+    def hook(status: dict) -> None:
+        total = status.get("total_bytes") or status.get("total_bytes_estimate")
+        if status.get("status") == "downloading" and total:
+            on_progress(min(status.get("downloaded_bytes", 0) / total, 1.0))
+    return hook
+
+
+def _build_ydl_opts(output_dir: str, on_progress=None) -> dict:
+    """Return yt-dlp options: mp3 extraction, or the native audio stream in pcm mode."""
+    opts = {
         "format": "bestaudio/best",
         "outtmpl": os.path.join(output_dir, "%(id)s.%(ext)s"),
-        "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "128"}],
         "quiet": True,
         "no_warnings": True,
     }
+    if WHISPER_AUDIO_MODE != "pcm":
+        opts["postprocessors"] = [{"key": "FFmpegExtractAudio", "preferredcodec": "mp3", "preferredquality": "128"}]
+    if on_progress is not None:
+        opts["progress_hooks"] = [_download_progress_hook(on_progress)]
+    return opts
+
 
+def _downloaded_path(ydl, info: dict, output_dir: str) -> str:
+    """Return the path of the file yt-dlp wrote for ``info``."""
+    if WHISPER_AUDIO_MODE != "pcm":
+        return os.path.join(output_dir, f"{info['id']}.mp3")
+    downloads = info.get("requested_downloads") or [{}]
+    return downloads[0].get("filepath") or ydl.prepare_filename(info)
 
-def download_audio(youtube_url: str, output_dir: str) -> str:
-    """Download audio from a YouTube URL and return the mp3 file path."""
+
+def download_audio(youtube_url: str, output_dir: str, on_progress=None) -> str:
+    """Download audio from a YouTube URL and return the local file path."""
     try:
-        with yt_dlp.YoutubeDL(_build_ydl_opts(output_dir)) as ydl:
+        with yt_dlp.YoutubeDL(_build_ydl_opts(output_dir, on_progress)) as ydl:
             info = ydl.extract_info(youtube_url, download=True)
-            audio_path = os.path.join(output_dir, f"{info['id']}.mp3")
+            if info.get("duration"):
+                metrics.audio_duration.observe(info["duration"])
+            audio_path = _downloaded_path(ydl, info, output_dir)
             if not os.path.exists(audio_path):
                 raise FileNotFoundError(f"Audio file not found at {audio_path}")
             return audio_path
@@ -74,102 +224,340 @@ def download_audio(youtube_url: str, output_dir: str) -> str:
         raise ValueError(f"Could not download audio: {exc}") from exc
 
 
-def transcribe_audio(audio_path: str) -> str:
-    """Transcribe an audio file with Whisper and return the plain-text transcript."""
+def decode_audio(audio_path: str):
+    """Decode a downloaded file into Whisper samples and delete the file."""
     try:
-        result = whisper.load_model(WHISPER_MODEL_SIZE).transcribe(audio_path, fp16=False)
-        text = result.get("text", "").strip()
+        samples = load_pcm(audio_path)
+    except Exception as exc:
+        logger.error("Audio decoding failed for %s: %s", audio_path, exc)
+        raise ValueError(f"Could not decode audio: {exc}") from exc
+    os.remove(audio_path)
+    return samples
+
+
+def _transcribe_single_pass(audio, on_progress=None) -> str:
+    """Transcribe the whole file or sample array in one Whisper call."""
+    with model_registry.acquire(WHISPER_MODEL_SIZE) as model, transcription_progress(on_progress):
+        return model.transcribe(audio, fp16=False).get("text", "")
+
+
+def transcribe_audio(audio, on_progress=None) -> str:
+    """Transcribe an audio file or decoded samples with Whisper and return the plain-text transcript."""
+    source = audio if isinstance(audio, str) else "decoded samples"
+    try:
+        duration = probe_duration(audio) if WHISPER_CHUNKED else 0.0
+        if duration > WHISPER_CHUNK_SECONDS:
+            text = transcribe_in_chunks(audio, duration, on_progress=on_progress).strip()
+        else:
+            text = _transcribe_single_pass(audio, on_progress).strip()
         if not text:
             raise ValueError("Whisper returned an empty transcript.")
         return text
     except Exception as exc:
-        logger.error("Transcription failed for %s: %s", audio_path, exc)
+        logger.error("Transcription failed for %s: %s", source, exc)
         raise ValueError(f"Could not transcribe audio: {exc}") from exc
 
 
-def _call_gemini(prompt: str) -> str:
-    """Send a prompt to Gemini and return the raw response text."""
-    client = genai.Client(api_key=GEMINI_API_KEY)
-    response = client.models.generate_content(
-        model="models/gemini-2.5-flash",
-        contents=prompt,
-        config=types.GenerateContentConfig(response_mime_type="application/json"),
-    )
-    return response.text.strip()
+def _call_gemini(prompt: str, schema) -> str:
+    """Send a prompt to Gemini through the shared client and return JSON text matching ``schema``."""
+    config = types.GenerateContentConfig(response_mime_type="application/json", response_schema=schema)
+    return generate_content(prompt, config).strip()
 
 
 def _parse_gemini_response(raw: str) -> dict:
-    """Strip code fences and parse JSON from a Gemini response."""
-    raw = re.sub(r"^```(?:json)?\s*", "", raw)
-    raw = re.sub(r"\s*```$", "", raw)
+    """Parse the JSON body of a Gemini response."""
     try:
-        return json.loads(raw)
+        data = json.loads(raw)
     except json.JSONDecodeError as exc:
         logger.error("Gemini returned invalid JSON: %s", raw[:500])
         raise ValueError(f"Gemini returned invalid JSON: {exc}") from exc
+    if not isinstance(data, dict):
+        raise ValueError("Gemini returned JSON that is not an object.")
+    return data
+
+
+def _normalize_answer(question) -> bool:
+    """Set an answer that differs from one option only in case or surrounding whitespace to that option.
+
+    Returns whether the answer was changed; the question is not validated otherwise.
+    """
+    if not isinstance(question, dict) or "answer" not in question:
+        return False
+    options = question.get("question_options")
+    if not isinstance(options, list) or question["answer"] in options:
+        return False
+    answer = str(question["answer"]).strip().casefold()
+    matches = [option for option in options if isinstance(option, str) and option.strip().casefold() == answer]
+    if len(matches) != 1:
+        return False
+    question["answer"] = matches[0]
+    return True
+
 
+def _question_problem(question):
+    """Return why a generated question is unusable, or None. The question is not modified."""
+    if not isinstance(question, dict) or not {"question_title", "question_options", "answer"}.issubset(question):
+        return "missing required fields"
+    options = question["question_options"]
+    if not isinstance(options, list) or len(options) != OPTIONS_PER_QUESTION:
+        return f"needs exactly {OPTIONS_PER_QUESTION} answer options"
+    if not all(isinstance(option, str) and option.strip() for option in options):
+        return "answer options must be non-empty text"
+    normalized = [option.strip().casefold() for option in options]
+    if len(set(normalized)) != len(options):
+        return "answer options are not distinct"
+    if question["answer"] not in options:
+        return "answer is not one of question_options"
+    return None
 
-def _validate_quiz_data(data: dict) -> None:
-    """Validate the structure of the Gemini quiz response."""
+
+def _validate_quiz_data(data: dict) -> list:
+    """Validate the quiz-level fields and return (index, problem) pairs of invalid questions."""
     required_keys = {"title", "description", "questions"}
     if not required_keys.issubset(data):
         raise ValueError(f"Missing keys in Gemini response: {required_keys - data.keys()}")
     if not isinstance(data["questions"], list) or not data["questions"]:
         raise ValueError("Gemini response contains no questions.")
-    for i, q in enumerate(data["questions"]):
-        if not {"question_title", "question_options", "answer"}.issubset(q):
-            raise ValueError(f"Question {i} is missing required fields.")
-        if q["answer"] not in q["question_options"]:
-            raise ValueError(f"Question {i}: answer is not in question_options.")
+    fixed = sum(_normalize_answer(q) for q in data["questions"])
+    if fixed:
+        metrics.invalid_questions.inc(fixed, outcome="fixed")
+    problems = ((i, _question_problem(q)) for i, q in enumerate(data["questions"]))
+    return [(i, problem) for i, problem in problems if problem is not None]
 
 
-def generate_quiz_data(transcript: str) -> dict:
-    """Send the transcript to Gemini and return the validated quiz dict."""
-    if not GEMINI_API_KEY:
-        raise ValueError("GEMINI_API_KEY is not set in the environment.")
+def _repair_questions(data: dict, invalid: list) -> list:
+    """Re-request only the invalid questions and return the (index, problem) pairs still invalid.
+
+    Questions Gemini returns no replacement for are not re-requested again and come back as invalid.
+    """
+    unanswered = []
+    for _ in range(GEMINI_REPAIR_ATTEMPTS):
+        if not invalid:
+            break
+        logger.warning("Re-requesting %d invalid questions: %s", len(invalid), invalid)
+        questions = [{"question": data["questions"][i], "problem": problem} for i, problem in invalid]
+        prompt = GEMINI_REPAIR_PROMPT_TEMPLATE.format(
+            count=len(questions), questions=json.dumps(questions, ensure_ascii=False, indent=2)
+        )
+        try:
+            replacements = _send_prompt(prompt, "gemini_repair", QuestionRepairSchema).get("questions")
+        except ValueError as exc:
+            logger.warning("Question repair failed: %s", exc)
+            break
+        if not isinstance(replacements, list):
+            break
+        if len(replacements) != len(invalid):
+            logger.warning("Question repair returned %d questions for %d requested", len(replacements), len(invalid))
+        replaced = invalid[:len(replacements)]
+        unanswered += [(i, "no replacement returned") for i, _ in invalid[len(replacements):]]
+        for (i, _), replacement in zip(replaced, replacements):
+            _normalize_answer(replacement)
+            data["questions"][i] = replacement
+        still_invalid = [(i, problem) for i, _ in replaced if (problem := _question_problem(data["questions"][i]))]
+        metrics.invalid_questions.inc(len(replaced) - len(still_invalid), outcome="repaired")
+        invalid = still_invalid
+    return invalid + unanswered
+
+
+def _check_quiz_data(data: dict) -> dict:
+    """Validate the quiz, repair invalid questions and drop those that stay invalid."""
+    invalid = _repair_questions(data, _validate_quiz_data(data))
+    if invalid:
+        metrics.invalid_questions.inc(len(invalid), outcome="dropped")
+        dropped = {i for i, _ in invalid}
+        data["questions"] = [q for i, q in enumerate(data["questions"]) if i not in dropped]
+        logger.warning("Dropped %d invalid questions, keeping %d", len(dropped), len(data["questions"]))
+    if len(data["questions"]) < QUIZ_MIN_QUESTIONS:
+        raise ValueError(
+            f"Gemini returned only {len(data['questions'])} valid questions (at least {QUIZ_MIN_QUESTIONS} required)."
+        )
+    return data
+
+
+def generate_quiz_data(transcript: str, use_cache: bool = True) -> dict:
+    """Return the validated quiz dict for a transcript, from the cache or from Gemini."""
+    transcript_hash = hashlib.sha256(transcript.encode()).hexdigest()
+    if use_cache:
+        cached = get_cached_quiz_data(transcript_hash, GEMINI_PROMPT_VERSION, GEMINI_MODEL)
+        if cached is not None:
+            logger.info("Using cached quiz data for transcript %s", transcript_hash[:12])
+            return cached
+    data = _request_quiz_data(transcript)
+    if use_cache:
+        store_quiz_data(transcript_hash, GEMINI_PROMPT_VERSION, GEMINI_MODEL, data)
+    return data
+
+
+def _send_prompt(prompt: str, stage: str, schema) -> dict:
+    """Send one prompt to Gemini under stage metrics and return the parsed JSON."""
     try:
-        prompt = GEMINI_PROMPT_TEMPLATE.format(transcript=transcript)
-        raw = _call_gemini(prompt)
+        payload_bytes = len(prompt.encode())
+        metrics.gemini_payload_size.observe(payload_bytes)
+        with metrics.track_stage(stage, payload_bytes=payload_bytes):
+            raw = _call_gemini(prompt, schema)
     except Exception as exc:
         logger.error("Gemini API call failed: %s", exc)
         raise ValueError(f"Gemini API error: {exc}") from exc
-    data = _parse_gemini_response(raw)
-    _validate_quiz_data(data)
-    return data
+    return _parse_gemini_response(raw)
 
 
-def _create_questions(quiz: Quiz, questions_data: list) -> None:
-    """Persist questions and their options for a quiz."""
-    for q_data in questions_data:
-        question = Question.objects.create(
-            quiz=quiz,
-            question_title=q_data["question_title"],
-            answer=q_data["answer"],
-        )
-        for option_text in q_data["question_options"]:
-            QuestionOption.objects.create(question=question, text=option_text)
+def _extract_facts(chunks: list) -> list:
+    """Ask Gemini for the key facts of every transcript chunk, in parallel and in order."""
+    prompts = [
+        GEMINI_FACTS_PROMPT_TEMPLATE.format(index=i + 1, total=len(chunks), transcript=chunk)
+        for i, chunk in enumerate(chunks)
+    ]
+    with ThreadPoolExecutor(max_workers=GEMINI_MAP_WORKERS) as pool:
+        results = list(pool.map(lambda prompt: _send_prompt(prompt, "gemini_map", FactsSchema), prompts))
+    facts = [fact for result in results for fact in result.get("facts", []) if isinstance(fact, str)]
+    if not facts:
+        raise ValueError("Gemini extracted no facts from the transcript.")
+    return facts
+
 
+def _request_quiz_data(transcript: str) -> dict:
+    """Send the transcript to Gemini and return the validated quiz dict.
 
-def save_quiz_to_db(data: dict, youtube_url: str, user) -> Quiz:
-    """Create and return a Quiz with all questions and options saved to the DB."""
-    quiz = Quiz.objects.create(
-        title=data["title"],
-        description=data.get("description", ""),
-        video_url=youtube_url,
-        created_by=user,
+    Transcripts above GEMINI_TOKEN_BUDGET are split into chunks whose key facts
+    are extracted in parallel; the quiz is then generated from the facts.
+    """
+    if not GEMINI_API_KEY:
+        raise ValueError("GEMINI_API_KEY is not set in the environment.")
+    tokens = count_tokens(transcript)
+    if tokens <= GEMINI_TOKEN_BUDGET:
+        prompt = GEMINI_PROMPT_TEMPLATE.format(transcript=transcript)
+    else:
+        chunks = split_by_tokens(transcript, GEMINI_CHUNK_TOKENS)
+        logger.info("Transcript has ~%d tokens, extracting facts from %d chunks", tokens, len(chunks))
+        facts = _extract_facts(chunks)
+        prompt = GEMINI_FACTS_QUIZ_PROMPT_TEMPLATE.format(facts="\n".join(f"- {fact}" for fact in facts))
+    return _check_quiz_data(_send_prompt(prompt, "gemini", QuizSchema))
+
+
+def _create_questions(quiz: Quiz, questions_data: list) -> None:
+    """Persist questions and their options for a quiz with one INSERT per table."""
+    questions = Question.objects.bulk_create(
+        Question(quiz=quiz, question_title=q_data["question_title"], answer=q_data["answer"])
+        for q_data in questions_data
+    )
+    QuestionOption.objects.bulk_create(
+        QuestionOption(question=question, text=option_text)
+        for question, q_data in zip(questions, questions_data)
+        for option_text in q_data["question_options"]
     )
-    _create_questions(quiz, data["questions"])
+
+
+def save_quiz_to_db(data: dict, youtube_url: str, user, transcript_source: str = TranscriptSource.WHISPER) -> Quiz:
+    """Create and return a Quiz with all questions and options saved in one transaction."""
+    with transaction.atomic():
+        quiz = Quiz.objects.create(
+            title=data["title"],
+            description=data.get("description", ""),
+            video_url=youtube_url,
+            transcript_source=transcript_source,
+            created_by=user,
+        )
+        _create_questions(quiz, data["questions"])
     return quiz
 
 
-def create_quiz_from_youtube(youtube_url: str, user) -> Quiz:
-    """Full pipeline: YouTube URL → transcription → Gemini → Quiz saved in DB."""
+def _report_stage(on_stage, stage: str) -> None:
+    """Notify the optional stage callback about a pipeline transition."""
+    if on_stage is not None:
+        on_stage(stage)
+
+
+def fetch_audio(youtube_url: str, output_dir: str, on_stage=None, on_progress=None):
+    """Download the audio of a video (decoded to samples in pcm mode) for transcription."""
+    logger.info("Downloading audio for %s", youtube_url)
+    _report_stage(on_stage, QuizJob.Stage.DOWNLOADING)
+    with metrics.track_stage("download"):
+        audio = download_audio(youtube_url, output_dir, on_progress)
+    if WHISPER_AUDIO_MODE == "pcm":
+        with metrics.track_stage("decode"):
+            audio = decode_audio(audio)
+    return audio
+
+
+def transcribe_fetched_audio(youtube_url: str, audio, on_stage=None, on_progress=None):
+    """Transcribe downloaded audio with Whisper and return (transcript, source)."""
+    logger.info("Transcribing audio for %s", youtube_url)
+    _report_stage(on_stage, QuizJob.Stage.TRANSCRIBING)
+    with metrics.track_stage("transcribe") as stage:
+        transcript = transcribe_audio(audio, on_progress)
+        stage["transcript_chars"] = len(transcript)
+    result = transcript, TranscriptSource.WHISPER
+    _remember_transcript(youtube_url, result)
+    return result
+
+
+def _fetch_captions(youtube_url: str):
+    """Return (transcript, source) from YouTube captions, or None to fall back to Whisper."""
+    with metrics.track_stage("captions") as stage:
+        result = fetch_caption_transcript(youtube_url)
+        stage["found"] = result is not None
+    if result is None:
+        return None
+    transcript, source, duration = result
+    metrics.whisper_seconds_skipped.inc(duration)
+    logger.info("Using %s for %s instead of Whisper", source, youtube_url)
+    return transcript, source
+
+
+def _remember_transcript(youtube_url: str, result: tuple) -> None:
+    """Count a newly obtained transcript and store it in the transcript cache."""
+    metrics.transcript_sources.inc(source=result[1], cache="miss")
+    video_id = extract_video_id(youtube_url)
+    if video_id:
+        store_transcript(video_id, WHISPER_MODEL_SIZE, *result)
+
+
+def lookup_transcript(youtube_url: str):
+    """Return (transcript, source) from the cache or YouTube captions, or None if Whisper is needed."""
+    video_id = extract_video_id(youtube_url)
+    if video_id:
+        cached = get_cached_transcript(video_id, WHISPER_MODEL_SIZE)
+        if cached is not None:
+            logger.info("Using cached transcript for video %s", video_id)
+            metrics.transcript_sources.inc(source=cached[1], cache="hit")
+            return cached
+    result = _fetch_captions(youtube_url) if CAPTIONS_ENABLED else None
+    if result is not None:
+        _remember_transcript(youtube_url, result)
+    return result
+
+
+def obtain_transcript(youtube_url: str, on_stage=None, on_progress=None):
+    """Return (transcript, source) from the cache, YouTube captions or Whisper, in that order."""
+    result = lookup_transcript(youtube_url)
+    if result is not None:
+        return result
     with tempfile.TemporaryDirectory() as tmp_dir:
-        logger.info("Downloading audio for %s", youtube_url)
-        audio_path = download_audio(youtube_url, tmp_dir)
-        logger.info("Transcribing audio at %s", audio_path)
-        transcript = transcribe_audio(audio_path)
+        audio = fetch_audio(youtube_url, tmp_dir, on_stage, on_progress)
+        return transcribe_fetched_audio(youtube_url, audio, on_stage, on_progress)
+
+
+def build_quiz(
+    youtube_url: str, user, transcript: str, transcript_source: str, on_stage=None, use_quiz_cache: bool = True
+) -> Quiz:
+    """Generate quiz data for a transcript with Gemini and save the quiz."""
     logger.info("Generating quiz via Gemini (transcript length: %d chars)", len(transcript))
-    quiz_data = generate_quiz_data(transcript)
+    metrics.transcript_length.observe(len(transcript))
+    _report_stage(on_stage, QuizJob.Stage.GENERATING)
+    quiz_data = generate_quiz_data(transcript, use_cache=use_quiz_cache)
     logger.info("Saving quiz '%s' to database", quiz_data.get("title"))
-    return save_quiz_to_db(quiz_data, youtube_url, user)
\ No newline at end of file
+    _report_stage(on_stage, QuizJob.Stage.SAVING)
+    with metrics.track_stage("save", questions=len(quiz_data["questions"])):
+        return save_quiz_to_db(quiz_data, youtube_url, user, transcript_source)
+
+
+def create_quiz_from_youtube(
+    youtube_url: str, user, on_stage=None, use_quiz_cache: bool = True, on_progress=None
+) -> Quiz:
+    """Full pipeline: YouTube URL → transcription → Gemini → Quiz saved in DB.
+
+    ``on_stage`` receives every stage transition, ``on_progress`` the completed
+    fraction (0–1) of the download and transcription stages.
+    """
+    transcript, transcript_source = obtain_transcript(youtube_url, on_stage, on_progress)
+    return build_quiz(youtube_url, user, transcript, transcript_source, on_stage, use_quiz_cache)
@@ -0,0 +1,218 @@
+"""
+Process-wide registry of loaded Whisper models.
+
+Each model size is loaded at most once per worker process and then shared by
+all threads. Whisper installs kv-cache hooks on the model while decoding, so
+inference on one model instance is serialized through a per-model lock.
+
+Whisper has no progress callback, only a tqdm bar over the decoded frames.
+While a thread is inside ``transcription_progress``, that bar is replaced by
+one that forwards progress to the callback registered for the thread; the
+original tqdm is restored once no thread reports progress any more.
+
+With WHISPER_QUANTIZE=True the linear layers of every loaded model are
+converted to dynamically quantized int8 ones, which run faster and smaller on
+CPU at some cost in accuracy (compare with ``bench_whisper_quantization``).
+"""
+
+import importlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import whisper
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL", "base")
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "False") == "True"
+WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "False") == "True"
+
+
+@dataclass(frozen=True)
+class ModelStats:
+    """Load time and memory footprint of a loaded Whisper model."""
+
+    size: str
+    load_seconds: float
+    parameter_bytes: int
+    quantized: bool = False
+
+
+def _model_bytes(model, quantized: bool = False) -> int:
+    """Return the memory held by the model's parameters and buffers, including packed int8 weights."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    if quantized:
+        import torch
+
+        for module in model.modules():
+            if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+                tensors.extend(t for t in module._weight_bias() if t is not None)
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+def quantize_linear_layers(model):
+    """Return ``model`` on the CPU with its linear layers dynamically quantized to int8.
+
+    Whisper uses a subclass of ``nn.Linear``, which ``quantize_dynamic`` does
+    not convert, so those layers are first replaced by plain ones.
+    """
+    import torch
+
+    model = model.cpu()
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.load_state_dict(child.state_dict())
+                setattr(parent, name, plain)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class WhisperModelRegistry:
+    """Loads Whisper models lazily, once per size, and hands them out under a lock."""
+
+    def __init__(self, loader=whisper.load_model, quantize: bool = WHISPER_QUANTIZE):
+        self._loader = loader
+        self._quantize = quantize
+        self._models = {}
+        self._stats = {}
+        self._inference_locks = {}
+        self._registry_lock = threading.Lock()
+        self._load_locks = {}
+
+    def get(self, size: str = WHISPER_MODEL_SIZE):
+        """Return the model for ``size``, loading it on first use."""
+        model = self._models.get(size)
+        if model is not None:
+            return model
+        with self._load_lock(size):
+            model = self._models.get(size)
+            if model is None:
+                model = self._load(size)
+        return model
+
+    @contextmanager
+    def acquire(self, size: str = WHISPER_MODEL_SIZE):
+        """Yield the model for ``size`` while holding its inference lock."""
+        model = self.get(size)
+        with self._inference_locks[size]:
+            yield model
+
+    def preload(self, *sizes: str) -> None:
+        """Load the given model sizes (default: the configured one) up front."""
+        for size in sizes or (WHISPER_MODEL_SIZE,):
+            self.get(size)
+
+    def stats(self) -> list:
+        """Return a ModelStats entry for every model loaded in this process."""
+        return list(self._stats.values())
+
+    def _load_lock(self, size: str) -> threading.Lock:
+        with self._registry_lock:
+            return self._load_locks.setdefault(size, threading.Lock())
+
+    def _load(self, size: str):
+        started = time.perf_counter()
+        model = self._loader(size)
+        if self._quantize:
+            model = quantize_linear_layers(model)
+        stats = ModelStats(
+            size=size,
+            load_seconds=time.perf_counter() - started,
+            parameter_bytes=_model_bytes(model, self._quantize),
+            quantized=self._quantize,
+        )
+        self._inference_locks[size] = threading.Lock()
+        self._stats[size] = stats
+        self._models[size] = model
+        logger.info(
+            "Loaded Whisper model '%s'%s in %.2fs (%.1f MB)",
+            size, " (int8)" if stats.quantized else "", stats.load_seconds, stats.parameter_bytes / 1024 ** 2,
+        )
+        return model
+
+
+model_registry = WhisperModelRegistry()
+
+_progress = threading.local()
+_progress_bar_lock = threading.Lock()
+_progress_bar_users = 0
+_original_tqdm = None
+
+
+class _ProgressBar:
+    """Drop-in for the tqdm bar of whisper.transcribe that reports to the thread's callback."""
+
+    def __init__(self, total=None, **kwargs):
+        self.total = total or 0
+        self.n = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def update(self, n=1):
+        self.n += n
+        callback = getattr(_progress, "callback", None)
+        if callback is not None and self.total:
+            callback(min(self.n / self.total, 1.0))
+
+
+def _transcribe_module():
+    """Return the ``whisper.transcribe`` module, which the function of the same name shadows."""
+    return importlib.import_module("whisper.transcribe")
+
+
+def _install_progress_bar() -> None:
+    """Swap Whisper's tqdm for ``_ProgressBar`` when the first thread starts reporting progress."""
+    global _progress_bar_users, _original_tqdm
+    with _progress_bar_lock:
+        if _progress_bar_users == 0:
+            _original_tqdm = _transcribe_module().tqdm
+            _transcribe_module().tqdm = SimpleNamespace(tqdm=_ProgressBar)
+        _progress_bar_users += 1
+
+
+def _restore_progress_bar() -> None:
+    """Put Whisper's tqdm back when the last thread stops reporting progress."""
+    global _progress_bar_users
+    with _progress_bar_lock:
+        _progress_bar_users -= 1
+        if _progress_bar_users == 0:
+            _transcribe_module().tqdm = _original_tqdm
+
+
+@contextmanager
+def transcription_progress(callback):
+    """Report the completed fraction of Whisper calls made by this thread to ``callback``."""
+    if callback is None:
+        yield
+        return
+    _install_progress_bar()
+    _progress.callback = callback
+    try:
+        yield
+    finally:
+        _progress.callback = None
+        _restore_progress_bar()
+
+
+@registry.register_collector
+def _model_metrics() -> list:
+    """Expose load time and memory footprint of the loaded Whisper models."""
+    stats = model_registry.stats()
+    return [
+        ("quizly_whisper_model_load_seconds", "gauge", "Time taken to load each Whisper model.",
+         [({"size": s.size, "quantized": str(s.quantized).lower()}, s.load_seconds) for s in stats]),
+        ("quizly_whisper_model_bytes", "gauge", "Memory held by each loaded Whisper model.",
+         [({"size": s.size, "quantized": str(s.quantized).lower()}, s.parameter_bytes) for s in stats]),
+    ]
@@ -17,7 +17,7 @@ from ..utils import (
     generate_tokens_for_user,
     set_auth_cookies,
     delete_auth_cookies,
-    blacklist_refresh_token,
+    log_out,
     refresh_access_token,
     build_user_payload,
 )
@@ -70,13 +70,13 @@ class TokenRefreshView(APIView):
 
 
 class LogoutView(APIView):
-    """Blacklist the refresh token and clear auth cookies."""
+    """End the session of the refresh token and clear auth cookies."""
 
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        """Blacklist refresh token and delete both auth cookies."""
-        blacklist_refresh_token(request.COOKIES.get("refresh_token"))
+        """Blacklist the refresh token, drop the cached user and delete both auth cookies."""
+        log_out(request.user, request.COOKIES.get("refresh_token"))
         response = Response({"detail": "Logged out successfully."}, status=status.HTTP_200_OK)
         delete_auth_cookies(response)
         return response
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        """Connect the signal receivers of the user cache and blacklist filter."""
+        from . import signals  # noqa: F401
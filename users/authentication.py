@@ -1,15 +1,148 @@
+import copy
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import TokenVersion
+from .user_cache import user_cache
+from .tokens import TOKEN_VERSION_CLAIM
+
+AUTH_CLAIMS_ONLY = os.getenv("AUTH_CLAIMS_ONLY", "False") == "True"
+# Only reads may trust the claims; writes always check the user.
+CLAIMS_ONLY_METHODS = ("GET", "HEAD")
 
 
 class CookieJWTAuthentication(JWTAuthentication):
-    """Reads the JWT access token from HTTP-only cookies instead of the Authorization header."""
+    """Reads the JWT access token from HTTP-only cookies instead of the Authorization header.
+
+    Users are resolved through ``user_cache``; the checks of
+    ``JWTAuthentication.get_user`` plus the token version run on every request.
+    """
 
     def authenticate(self, request):
         """Return authenticated user from access_token cookie, or None if missing."""
+        validated_token = self._cookie_token(request)
+        if validated_token is None:
+            return None
+        return self.get_user(validated_token), validated_token
+
+    async def aauthenticate(self, request):
+        """Async variant of ``authenticate`` for async views; loads the user with the async ORM."""
+        validated_token = self._cookie_token(request)
+        if validated_token is None:
+            return None
+        return await self.aget_user(validated_token), validated_token
+
+    def _cookie_token(self, request):
+        """Return the validated token of the access_token cookie, or None if missing."""
         access_token = request.COOKIES.get('access_token')
 
         if not access_token:
             return None
 
-        validated_token = self.get_validated_token(access_token)
-        return self.get_user(validated_token), validated_token
+        return self.get_validated_token(access_token)
+
+    def get_user(self, validated_token):
+        """Return the cached or freshly loaded user of the token after checking it."""
+        user_id = self._user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = self._users().get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as exc:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from exc
+            user_cache.set(user_id, user)
+        return self._check_user(user, validated_token)
+
+    async def aget_user(self, validated_token):
+        """Async variant of ``get_user`` with the same checks."""
+        user_id = self._user_id(validated_token)
+        user = user_cache.get(user_id)
+        if user is None:
+            try:
+                user = await self._users().aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as exc:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from exc
+            user_cache.set(user_id, user)
+        return self._check_user(user, validated_token)
+
+    def _user_id(self, validated_token):
+        """Return the token's user id converted to the type of the user id field."""
+        try:
+            return _user_id_field().to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError) as exc:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from exc
+
+    def _users(self):
+        """Return the user queryset, with the token version joined in."""
+        return self.user_model.objects.select_related("token_version")
+
+    def _check_user(self, user, validated_token):
+        """Apply the active, password and token version checks; return a per-request copy of the user."""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        try:
+            version = user.token_version.version
+        except TokenVersion.DoesNotExist:
+            version = 0
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != version:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+
+        return copy.copy(user)
+
+
+class ClaimsUser(TokenUser):
+    """TokenUser whose id has the type of the user id field, so ownership checks compare equal."""
+
+    @cached_property
+    def id(self):
+        return _user_id_field().to_python(self.token[api_settings.USER_ID_CLAIM])
+
+
+class ClaimsOnlyCookieJWTAuthentication(CookieJWTAuthentication):
+    """For views whose reads only need ``request.user.id``.
+
+    With AUTH_CLAIMS_ONLY=True, GET and HEAD requests get a user built from the
+    token claims and no query runs; deactivation and logout then take effect
+    there when the access token expires. Writes, and every request while the
+    mode is off, are authenticated like CookieJWTAuthentication.
+    """
+
+    def authenticate(self, request):
+        """Return a ClaimsUser for reads in claims-only mode, otherwise the checked user."""
+        if not _claims_only(request):
+            return super().authenticate(request)
+        validated_token = self._cookie_token(request)
+        if validated_token is None:
+            return None
+        self._user_id(validated_token)
+        return ClaimsUser(validated_token), validated_token
+
+    async def aauthenticate(self, request):
+        """Async variant of ``authenticate``."""
+        if not _claims_only(request):
+            return await super().aauthenticate(request)
+        return self.authenticate(request)
+
+
+def _claims_only(request) -> bool:
+    """Return whether ``request`` may be authenticated from the token claims alone."""
+    return AUTH_CLAIMS_ONLY and request.method in CLAIMS_ONLY_METHODS
+
+
+def _user_id_field():
+    """Return the user model field that tokens identify users by."""
+    return get_user_model()._meta.get_field(api_settings.USER_ID_FIELD)
@@ -0,0 +1,165 @@
+"""
+Refresh-token blacklist upkeep: batched pruning and an in-memory pre-check.
+
+simplejwt records every issued refresh token as an OutstandingToken and every
+revoked one as a BlacklistedToken, and never deletes them. ``prune_expired_tokens``
+removes expired rows in small batches (``prune_tokens`` command and a daemon
+thread that core.wsgi / core.asgi start in server processes only).
+
+Verifying a refresh token normally looks its jti up in the blacklist. A
+bloom filter of the blacklisted jtis answers "definitely not blacklisted"
+for most tokens without that query; only possible members are checked in the
+database. The filter is rebuilt from the table, gets tokens blacklisted in
+this process through a signal, and reads rows added by other processes every
+TOKEN_BLACKLIST_FILTER_SYNC_SECONDS. Rows committed out of id order by
+concurrent writers on PostgreSQL are picked up by the next rebuild.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+from django.db import DatabaseError, connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PRUNE_INTERVAL_SECONDS = float(os.getenv("TOKEN_PRUNE_INTERVAL_SECONDS", "3600"))
+TOKEN_PRUNE_BATCH_SIZE = int(os.getenv("TOKEN_PRUNE_BATCH_SIZE", "1000"))
+TOKEN_BLACKLIST_FILTER_FPR = float(os.getenv("TOKEN_BLACKLIST_FILTER_FPR", "0.001"))
+TOKEN_BLACKLIST_FILTER_SYNC_SECONDS = float(os.getenv("TOKEN_BLACKLIST_FILTER_SYNC_SECONDS", "5"))
+# Room for tokens blacklisted after a rebuild before the filter is rebuilt larger.
+FILTER_MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """Fixed-size bloom filter of strings."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        """Yield the bit positions of ``item`` (double hashing over one SHA-256 digest)."""
+        digest = hashlib.sha256(item.encode()).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        """Set the bits of ``item``."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistFilter:
+    """Process-wide bloom filter of blacklisted refresh-token jtis, kept in sync with the table."""
+
+    def __init__(self):
+        self._bloom = None
+        self._last_id = 0
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+
+    def might_contain(self, jti: str) -> bool:
+        """Return False only if ``jti`` is certainly not blacklisted."""
+        try:
+            with self._lock:
+                if self._bloom is None or self._bloom.count > self._bloom.capacity:
+                    self._rebuild()
+                elif time.monotonic() - self._last_sync >= TOKEN_BLACKLIST_FILTER_SYNC_SECONDS:
+                    self._sync()
+                return jti in self._bloom
+        except DatabaseError:
+            logger.exception("Could not load the token blacklist filter; checking the database")
+            return True
+
+    def add(self, jti: str) -> None:
+        """Record a jti blacklisted in this process."""
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def invalidate(self) -> None:
+        """Drop the filter so the next check rebuilds it from the table."""
+        with self._lock:
+            self._bloom = None
+
+    def _rebuild(self) -> None:
+        """Load all unexpired blacklisted jtis into a new filter sized for them."""
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        count = rows.count()
+        bloom = BloomFilter(max(FILTER_MIN_CAPACITY, 2 * count), TOKEN_BLACKLIST_FILTER_FPR)
+        last_id = 0
+        for row_id, jti in rows.order_by("id").values_list("id", "token__jti").iterator():
+            bloom.add(jti)
+            last_id = row_id
+        self._bloom, self._last_id, self._last_sync = bloom, last_id, time.monotonic()
+
+    def _sync(self) -> None:
+        """Add rows blacklisted since the last rebuild or sync, e.g. by other processes."""
+        rows = BlacklistedToken.objects.filter(id__gt=self._last_id).order_by("id").values_list("id", "token__jti")
+        for row_id, jti in rows:
+            self._bloom.add(jti)
+            self._last_id = row_id
+        self._last_sync = time.monotonic()
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken that skips the blacklist query when the filter rules the token out."""
+
+    def check_blacklist(self) -> None:
+        if blacklist_filter.might_contain(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+
+def prune_expired_tokens(batch_size: int = TOKEN_PRUNE_BATCH_SIZE) -> int:
+    """Delete expired outstanding tokens (and their blacklist rows) in batches; return the number deleted."""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        # Refresh tokens share one lifetime, so the oldest ids expire first and the id-ordered scan stops early.
+        expired = OutstandingToken.objects.filter(expires_at__lte=now).order_by("id")
+        batch = list(expired.values_list("id", flat=True)[:batch_size])
+        if not batch:
+            break
+        OutstandingToken.objects.filter(id__in=batch).delete()
+        deleted += len(batch)
+    if deleted:
+        blacklist_filter.invalidate()
+    return deleted
+
+
+def _prune_periodically() -> None:
+    """Prune expired tokens every TOKEN_PRUNE_INTERVAL_SECONDS, forever."""
+    while True:
+        time.sleep(TOKEN_PRUNE_INTERVAL_SECONDS)
+        try:
+            deleted = prune_expired_tokens()
+            logger.info("Pruned %d expired refresh tokens", deleted)
+        except DatabaseError:
+            logger.exception("Pruning expired refresh tokens failed")
+        finally:
+            connections.close_all()
+
+
+def start_token_pruning() -> None:
+    """Start the pruning thread of this process unless TOKEN_PRUNE_INTERVAL_SECONDS is 0."""
+    if TOKEN_PRUNE_INTERVAL_SECONDS > 0:
+        threading.Thread(target=_prune_periodically, name="token-prune", daemon=True).start()
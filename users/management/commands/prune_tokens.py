@@ -0,0 +1,23 @@
+"""
+Delete expired refresh tokens from the simplejwt outstanding/blacklist tables.
+
+Runs the same batched pruning as the in-process thread; use it from cron
+when TOKEN_PRUNE_INTERVAL_SECONDS=0:
+
+    python manage.py prune_tokens --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+
+from users.blacklist import TOKEN_PRUNE_BATCH_SIZE, prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted refresh tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=TOKEN_PRUNE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        deleted = prune_expired_tokens(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired refresh tokens."))
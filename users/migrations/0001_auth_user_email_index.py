@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:22
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Index auth_user.email for the duplicate check in RegisterSerializer.validate_email.
+
+    auth.User belongs to django.contrib.auth, so the index is created with SQL
+    instead of a model Meta option.
+    """
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS users_auth_user_email_idx ON auth_user (email);',
+            reverse_sql='DROP INDEX IF EXISTS users_auth_user_email_idx;',
+        ),
+    ]
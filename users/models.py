@@ -0,0 +1,12 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class TokenVersion(models.Model):
+    """Per-user counter copied into issued tokens; bumping it revokes every token issued before."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="token_version")
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} (v{self.version})"
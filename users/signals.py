@@ -0,0 +1,36 @@
+"""
+Drop cached users when their row or token version changes, and add newly
+blacklisted refresh tokens to the blacklist filter.
+
+Saving a user covers deactivation and password changes made anywhere,
+including the admin; bulk ``update()`` calls send no signals and must
+invalidate ``user_cache`` themselves (see ``bump_token_version``).
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .blacklist import blacklist_filter
+from .models import TokenVersion
+from .user_cache import user_cache
+
+
+@receiver([post_save, post_delete], sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    """Invalidate the cached copy of a saved or deleted user."""
+    user_cache.invalidate(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=TokenVersion)
+def drop_cached_user_of_version(sender, instance, **kwargs):
+    """Invalidate the cached user whose token version changed."""
+    user_cache.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_to_blacklist_filter(sender, instance, created, **kwargs):
+    """Make a token blacklisted in this process visible to the filter at once."""
+    if created:
+        blacklist_filter.add(instance.token.jti)
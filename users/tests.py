@@ -0,0 +1,173 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from quizzes.models import Quiz
+
+from . import authentication, blacklist, utils
+from .blacklist import FilteredRefreshToken, blacklist_filter, prune_expired_tokens
+from .models import TokenVersion
+from .tokens import TOKEN_VERSION_CLAIM
+from .user_cache import user_cache
+from .utils import generate_tokens_for_user, refresh_access_token
+
+
+def _login(username: str = "alice", password: str = "secret") -> APIClient:
+    """Return a client holding the auth cookies of a fresh login."""
+    client = APIClient()
+    response = client.post("/api/login/", {"username": username, "password": password}, format="json")
+    assert response.status_code == 200, response.content
+    return client
+
+
+class LogoutTests(TestCase):
+    """Logout ends one session; with AUTH_LOGOUT_ALL_DEVICES it revokes every session of the user."""
+
+    def setUp(self):
+        user_cache.clear()
+        blacklist_filter.invalidate()
+        self.addCleanup(blacklist_filter.invalidate)
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret")
+
+    def test_logout_keeps_other_sessions(self):
+        phone, laptop = _login(), _login()
+        phone_refresh = phone.cookies["refresh_token"].value
+        self.assertEqual(phone.post("/api/logout/").status_code, 200)
+
+        self.assertEqual(laptop.get("/api/quizzes/").status_code, 200)
+        self.assertEqual(laptop.post("/api/token/refresh/").status_code, 200)
+        with self.assertRaises(TokenError):
+            refresh_access_token(phone_refresh)
+
+    @mock.patch.object(utils, "AUTH_LOGOUT_ALL_DEVICES", True)
+    def test_logout_all_devices_rejects_refresh_tokens_of_other_sessions(self):
+        phone, laptop = _login(), _login()
+        self.assertEqual(phone.post("/api/logout/").status_code, 200)
+
+        self.assertEqual(laptop.get("/api/quizzes/").status_code, 401)
+        # The access cookie expires before the access token; refreshing then must fail too.
+        del laptop.cookies["access_token"]
+        self.assertEqual(laptop.post("/api/token/refresh/").status_code, 401)
+
+    @mock.patch.object(utils, "AUTH_LOGOUT_ALL_DEVICES", True)
+    def test_login_after_logout_all_devices_issues_working_tokens(self):
+        self.assertEqual(_login().post("/api/logout/").status_code, 200)
+
+        client = _login()
+        self.assertEqual(client.post("/api/token/refresh/").status_code, 200)
+        self.assertEqual(client.get("/api/quizzes/").status_code, 200)
+
+    @mock.patch.object(blacklist, "TOKEN_BLACKLIST_FILTER_SYNC_SECONDS", 3600)
+    def test_refresh_reads_the_version_from_the_user_cache(self):
+        refresh = generate_tokens_for_user(self.user)[1]
+        refresh_access_token(refresh)
+        with self.assertNumQueries(0):
+            refresh_access_token(refresh)
+
+
+class IssuedTokenTests(TestCase):
+    """The refresh token recorded as outstanding is the one sent to the client."""
+
+    def test_outstanding_token_carries_the_version_claim(self):
+        user = User.objects.create_user("alice", "alice@example.com", "secret")
+        TokenVersion.objects.create(user=user, version=3)
+
+        refresh = generate_tokens_for_user(user)[1]
+
+        self.assertEqual(OutstandingToken.objects.get().token, refresh)
+        self.assertEqual(FilteredRefreshToken(refresh)[TOKEN_VERSION_CLAIM], 3)
+
+
+@mock.patch.object(authentication, "AUTH_CLAIMS_ONLY", True)
+class ClaimsOnlyAuthenticationTests(TestCase):
+    """Claims-only mode trusts the token for reads but checks the user for writes."""
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret")
+        self.quiz = Quiz.objects.create(title="Quiz", video_url="https://youtu.be/dQw4w9WgXcQ", created_by=self.user)
+        self.url = f"/api/quizzes/{self.quiz.pk}/"
+        self.client = _login()
+
+    def test_read_skips_the_user_query(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_deactivated_user_cannot_write(self):
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.client.patch(self.url, {"title": "Changed"}, format="json").status_code, 401)
+        self.assertEqual(self.client.delete(self.url).status_code, 401)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.title, "Quiz")
+
+
+class BlacklistTests(TestCase):
+    """Blacklisted refresh tokens stay rejected with the in-memory filter in front of the table."""
+
+    def setUp(self):
+        blacklist_filter.invalidate()
+        self.addCleanup(blacklist_filter.invalidate)
+        self.user = User.objects.create_user("alice", "alice@example.com", "secret")
+
+    def _jti(self, refresh_token: str) -> str:
+        """Return the jti of a refresh token, blacklisted or not."""
+        return FilteredRefreshToken(refresh_token, verify=False)["jti"]
+
+    def test_rotated_token_is_rejected(self):
+        refresh = generate_tokens_for_user(self.user)[1]
+        refresh_access_token(refresh)
+
+        serializer = TokenRefreshSerializer(data={"refresh": refresh})
+        serializer.is_valid(raise_exception=True)
+        rotated = serializer.validated_data["refresh"]
+
+        with self.assertRaises(TokenError):
+            refresh_access_token(refresh)
+        refresh_access_token(rotated)
+
+    def test_logged_out_token_is_blacklisted(self):
+        client = _login()
+        refresh = client.cookies["refresh_token"].value
+        refresh_access_token(refresh)
+
+        self.assertEqual(client.post("/api/logout/").status_code, 200)
+
+        self.assertTrue(blacklist_filter.might_contain(self._jti(refresh)))
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(refresh)
+
+    def test_filter_picks_up_rows_written_by_other_processes(self):
+        refresh = generate_tokens_for_user(self.user)[1]
+        jti = self._jti(refresh)
+        self.assertFalse(blacklist_filter.might_contain(jti))
+
+        # bulk_create sends no signal, like a blacklist write in another process.
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=OutstandingToken.objects.get(jti=jti))])
+        with mock.patch.object(blacklist, "TOKEN_BLACKLIST_FILTER_SYNC_SECONDS", 0):
+            self.assertTrue(blacklist_filter.might_contain(jti))
+            with self.assertRaises(TokenError):
+                refresh_access_token(refresh)
+
+    def test_prune_removes_only_expired_tokens(self):
+        expired = [generate_tokens_for_user(self.user)[1] for _ in range(3)]
+        FilteredRefreshToken(expired[0]).blacklist()
+        OutstandingToken.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        live = [generate_tokens_for_user(self.user)[1] for _ in range(2)]
+        FilteredRefreshToken(live[0]).blacklist()
+
+        self.assertEqual(prune_expired_tokens(batch_size=2), 3)
+
+        self.assertEqual(set(OutstandingToken.objects.values_list("jti", flat=True)), {self._jti(t) for t in live})
+        self.assertEqual(BlacklistedToken.objects.get().token.jti, self._jti(live[0]))
+        refresh_access_token(live[1])
@@ -0,0 +1,43 @@
+"""
+Refresh tokens stamped with the user's token version.
+
+``TokenVersion.version`` is copied into every refresh token, and the access
+tokens derived from it, as the ``ver`` claim; bumping the version revokes
+every token issued before. The claim is set before simplejwt records the
+token as outstanding, so the stored token string is the one the client gets.
+"""
+
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import BlacklistMixin
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import FilteredRefreshToken
+from .models import TokenVersion
+
+TOKEN_VERSION_CLAIM = "ver"
+
+
+def get_token_version(user_id) -> int:
+    """Return the current token version of the user with this id (0 until the first bump)."""
+    versions = TokenVersion.objects.filter(**{f"user__{api_settings.USER_ID_FIELD}": user_id})
+    return versions.values_list("version", flat=True).first() or 0
+
+
+class VersionedRefreshToken(FilteredRefreshToken):
+    """Refresh token that carries the user's token version from the moment it is issued."""
+
+    @classmethod
+    def for_user(cls, user):
+        """Build the token with Token.for_user, add the version claim, then record it as outstanding."""
+        # BlacklistMixin.for_user would store the token before the claim could be added.
+        token = super(BlacklistMixin, cls).for_user(user)
+        token[TOKEN_VERSION_CLAIM] = get_token_version(getattr(user, api_settings.USER_ID_FIELD))
+        OutstandingToken.objects.create(
+            user=user,
+            jti=token[api_settings.JTI_CLAIM],
+            token=str(token),
+            created_at=token.current_time,
+            expires_at=datetime_from_epoch(token["exp"]),
+        )
+        return token
@@ -5,16 +5,33 @@ Helper functions for authentication views.
 Business logic is kept here to keep views thin and focused.
 """
 
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.exceptions import TokenError
+import os
+
+from django.db.models import F
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+
+from .authentication import CookieJWTAuthentication
+from .blacklist import FilteredRefreshToken as RefreshToken
+from .models import TokenVersion
+from .tokens import VersionedRefreshToken
+from .user_cache import user_cache
+
+AUTH_LOGOUT_ALL_DEVICES = os.getenv("AUTH_LOGOUT_ALL_DEVICES", "False") == "True"
 
 
 def generate_tokens_for_user(user):
     """Generate and return (access_token, refresh_token) strings for a user."""
-    refresh = RefreshToken.for_user(user)
+    refresh = VersionedRefreshToken.for_user(user)
     return str(refresh.access_token), str(refresh)
 
 
+def bump_token_version(user) -> None:
+    """Revoke all access tokens issued to the user so far and drop the cached user."""
+    TokenVersion.objects.get_or_create(user=user)
+    TokenVersion.objects.filter(user=user).update(version=F("version") + 1)
+    user_cache.invalidate(user.pk)
+
+
 def set_auth_cookies(response, access_token, refresh_token):
     """Attach JWT access and refresh tokens as HTTP-only cookies to a response."""
     response.set_cookie(
@@ -41,9 +58,28 @@ def blacklist_refresh_token(refresh_token: str) -> None:
         pass
 
 
+def log_out(user, refresh_token: str) -> None:
+    """End the session of this refresh token, or every session of the user with AUTH_LOGOUT_ALL_DEVICES."""
+    blacklist_refresh_token(refresh_token)
+    if AUTH_LOGOUT_ALL_DEVICES:
+        bump_token_version(user)
+    else:
+        user_cache.invalidate(user.pk)
+
+
 def refresh_access_token(refresh_token: str) -> str:
-    """Return a new access token string from a valid refresh token."""
-    return str(RefreshToken(refresh_token).access_token)
+    """Return a new access token string from a valid refresh token.
+
+    The user and its token version come from ``user_cache`` with the checks
+    applied to access tokens, so a revoked version or an inactive user raise
+    TokenError without a query on cache hits.
+    """
+    refresh = RefreshToken(refresh_token)
+    try:
+        CookieJWTAuthentication().get_user(refresh)
+    except AuthenticationFailed as exc:
+        raise TokenError("Token has been revoked") from exc
+    return str(refresh.access_token)
 
 
 def build_user_payload(user) -> dict: